@@ -0,0 +1,474 @@
+"""
+Micro-benchmarks for the bot's storage and parsing hot paths.
+
+Usage: python bench.py <benchmark> [options]
+Run without arguments to list the available benchmarks.
+"""
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from db import Database
+
+
+def _report(label: str, seconds: float, ops: int):
+    print(f"{label:<40} {seconds / ops * 1e6:9.1f} us/op  ({ops} ops in {seconds:.2f}s)")
+
+
+def bench_db_ops(ops: int = 2000):
+    """Per-op latency of connection-per-call SQLite access (the old db.py pattern) vs the persistent WAL connection."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "persistent.db"))
+
+        # Baseline: same schema, default rollback journal, new connection for every operation
+        baseline_file = os.path.join(tmp, "per_call.db")
+        Database(baseline_file).close()
+        conn = sqlite3.connect(baseline_file)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+
+        def per_call(sql, params, commit):
+            conn = sqlite3.connect(baseline_file)
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            if commit:
+                conn.commit()
+            conn.close()
+
+        write_sql = "INSERT OR REPLACE INTO gambling_balances (guild_id, user_id, balance) VALUES (?, ?, ?)"
+        read_sql = "SELECT balance FROM gambling_balances WHERE guild_id = ? AND user_id = ?"
+
+        start = time.perf_counter()
+        for i in range(ops):
+            per_call(write_sql, (1, i % 100, i), True)
+        _report("write, connection per call", time.perf_counter() - start, ops)
+
+        start = time.perf_counter()
+        for i in range(ops):
+            db.set_gambling_balance(1, i % 100, i)
+        _report("write, persistent WAL connection", time.perf_counter() - start, ops)
+
+        start = time.perf_counter()
+        for i in range(ops):
+            per_call(read_sql, (1, i % 100), False)
+        _report("read, connection per call", time.perf_counter() - start, ops)
+
+        start = time.perf_counter()
+        for i in range(ops):
+            db.get_gambling_balance(1, i % 100)
+        _report("read, persistent WAL connection", time.perf_counter() - start, ops)
+
+        db.close()
+
+
+def bench_manifest(files: int = 50000):
+    """Parse time, peak traced memory and child-process peak RSS of a synthetic manifest: whole-document json vs streaming."""
+    import server_status
+
+    entries = [{"Path": f"Data/patch-{i // 1000}/file{i}.mpq", "Hash": f"{i:032x}", "Size": 1024 + i,
+                "Urls": {"cloudflare": f"https://cdn.example.net/{i}", "digitalocean": f"https://do.example.net/{i}"}}
+               for i in range(files)]
+    # A null entry must not end the stream early
+    entries.insert(files // 2, None)
+    # Nested and null top-level fields on both sides of Files, which the summary must keep
+    body = json.dumps({"Version": "3.3.5", "Uid": "f" * 40, "Mirrors": {"cdn": ["a", "b"]}, "Notes": None,
+                       "Files": entries, "Signature": {"alg": "sha256", "value": None}}).encode()
+    del entries
+    print(f"manifest: {files} files, {len(body) / (1024 * 1024):.1f} MiB")
+
+    # Steady state: every file already indexed, so the diff itself allocates nothing
+    index = {f"Data/patch-{i // 1000}/file{i}.mpq": f"{i:032x}" for i in range(files)}
+
+    def run(label, parse):
+        differ = server_status.ManifestDiffer()
+        differ._index = index
+        # Timed run first; tracemalloc slows allocation-heavy code down several times
+        start = time.perf_counter()
+        summary, file_iter = parse()
+        diff = differ.diff(file_iter)
+        elapsed = time.perf_counter() - start
+        assert summary["Version"] == "3.3.5" and not diff["upserts"]
+        del summary, file_iter, diff
+        tracemalloc.start()
+        summary, file_iter = parse()
+        differ.diff(file_iter)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<40} {elapsed * 1000:9.1f} ms     peak {peak / (1024 * 1024):7.1f} MiB")
+
+    def whole_document():
+        manifest = json.loads(body)
+        return manifest, manifest["Files"]
+
+    run("json.loads, whole document (old)", whole_document)
+    parsers = [("ijson streaming", server_status.ijson, None),
+               ("orjson, whole document", None, server_status.orjson),
+               ("json fallback", None, None)]
+    saved = server_status.ijson, server_status.orjson
+    for label, streaming, fast in parsers:
+        if label != "json fallback" and (streaming or fast) is None:
+            print(f"{label:<40} skipped (not installed)")
+            continue
+        server_status.ijson, server_status.orjson = streaming, fast
+        run(f"parse_manifest, {label}", lambda: server_status.parse_manifest(body))
+    server_status.ijson, server_status.orjson = saved
+
+    # Every parser must give the same summary (key order included) and entries as the json fallback
+    def parsed(streaming, fast):
+        server_status.ijson, server_status.orjson = streaming, fast
+        summary, file_iter = server_status.parse_manifest(body)
+        entries = list(file_iter)
+        return list(summary.items()), entries
+    reference = parsed(None, None)
+    for label, streaming, fast in parsers[:2]:
+        if streaming or fast:
+            assert parsed(streaming, fast) == reference, f"{label} output differs from the json fallback"
+    server_status.ijson, server_status.orjson = saved
+    print("identical summary and entries from every installed parser")
+
+    # tracemalloc only sees the Python heap; the peak RSS (VmHWM) of a fresh process per parser also
+    # counts the parser's C buffers. It is read inside the child because a forked child's ru_maxrss
+    # starts at the parent's size. The "body only" row is the floor: interpreter, imports, raw body.
+    child = ("import sys, server_status\n"
+             "body = open(sys.argv[1], 'rb').read()\n"
+             "if sys.argv[2] != 'body':\n"
+             "    server_status.ijson = server_status.ijson if sys.argv[2] == 'ijson' else None\n"
+             "    server_status.orjson = server_status.orjson if sys.argv[2] == 'orjson' else None\n"
+             "    summary, files = server_status.parse_manifest(body)\n"
+             "    for _ in files:\n"
+             "        pass\n"
+             "with open('/proc/self/status') as status:\n"
+             "    print(next(line.split()[1] for line in status if line.startswith('VmHWM:')))\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "manifest.json")
+        with open(path, "wb") as f:
+            f.write(body)
+        for label, mode in [("body only", "body"), ("ijson streaming", "ijson"),
+                            ("orjson, whole document", "orjson"), ("json fallback", "json")]:
+            if mode in ("ijson", "orjson") and getattr(server_status, mode) is None:
+                print(f"{'peak RSS, ' + label:<40} skipped (not installed)")
+                continue
+            result = subprocess.run([sys.executable, "-c", child, path, mode], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)))
+            if result.returncode != 0:
+                # No /proc (not Linux) or the parser isn't installed
+                print(f"{'peak RSS, ' + label:<40} not measured ({result.stderr.strip().splitlines()[-1]})")
+                continue
+            print(f"{'peak RSS, ' + label:<40} {int(result.stdout) / 1024:9.1f} MiB")
+
+
+def bench_branches(ops: int = 200):
+    """Branch lookup cost: scraping the github.com branches page (old) vs parsing the repository activity API."""
+    import re
+    from cogs.gitcheck import parse_branch_activity, BRANCH_ACTIVITY_PAGE_SIZE
+
+    repo_path = "Project-Epoch/TrinityCore"
+    # Synthetic stand-ins for the two responses. The real branches page is a few hundred KB of markup
+    # around ~20 rows; the activity response is a bounded page of push events.
+    row = ('<div class="Box-row"><div class="d-flex flex-items-center"><svg aria-hidden="true" height="16" '
+           'viewBox="0 0 16 16" width="16" class="octicon octicon-git-branch"><path d="M9.5 3.25a2.25 2.25 0 1 1 3 '
+           '2.122V6A2.5 2.5 0 0 1 10 8.5H6a1 1 0 0 0-1 1v1.128a2.251 2.251 0 1 1-1.5 0V5.372a2.25 2.25 0 1 1 1.5 0v1.836'
+           'A2.493 2.493 0 0 1 6 7h4a1 1 0 0 0 1-1v-.628A2.25 2.25 0 0 1 9.5 3.25Z"></path></svg>'
+           '<a class="branch-name css-truncate-target" href="/' + repo_path + '/tree/{name}" title="{name}">{name}</a>'
+           '<relative-time datetime="2026-10-16T12:00:00Z" class="no-wrap"></relative-time></div></div>\n')
+    filler = '<div class="js-navigation-container" data-hpc="" data-pjax="">' + "x" * 12000 + "</div>\n"
+    html = (filler * 20 + "".join(row.format(name=f"feature/branch-{i}") for i in range(20)) + filler * 5).encode()
+    events = [{"id": i, "before": "0" * 40, "after": f"{i:040x}", "ref": f"refs/heads/feature/branch-{i % 12}",
+               "timestamp": f"2026-10-16T{23 - i % 24:02d}:00:00Z", "activity_type": "push",
+               "actor": {"login": f"dev{i % 5}", "id": i, "type": "User", "site_admin": False,
+                         "avatar_url": f"https://avatars.githubusercontent.com/u/{i}?v=4"}}
+              for i in range(BRANCH_ACTIVITY_PAGE_SIZE)]
+    activity = json.dumps(events).encode()
+
+    def scrape(body):
+        html_content = body.decode()
+        patterns = [
+            r'<a[^>]*href="/' + re.escape(repo_path) + r'/tree/([^"]+)"[^>]*>([^<]+)</a>',
+            r'href="/' + re.escape(repo_path) + r'/tree/([^"]+)"',
+            r'/tree/([^"]+)"[^>]*>([^<]+)</a>'
+        ]
+        for pattern in patterns:
+            matches = re.findall(pattern, html_content)
+            if matches:
+                return next(m[0] for m in matches if m[0] not in ['main', 'master'])
+
+    def from_activity(body):
+        return parse_branch_activity(json.loads(body), exclude={'main', 'master', 'epoch-core'})[0]['branch_name']
+
+    print(f"{'branches page (old)':<40} {len(html):9d} bytes + 1 commit API call")
+    print(f"{'activity API':<40} {len(activity):9d} bytes")
+    for label, parse, body in [("regex scrape of branches page (old)", scrape, html),
+                               ("parse activity API response", from_activity, activity)]:
+        start = time.process_time()
+        for _ in range(ops):
+            parse(body)
+        _report(label, time.process_time() - start, ops)
+
+
+def bench_bets(bets: int = 2000, workers: int = 16):
+    """Concurrency stress for bet placement: the old five-call sequence vs Database.place_bet, checked for lost epochs."""
+    stake, starting = 5, 1000
+    expected = starting // stake
+
+    def old_sequence(db):
+        # The pre-place_bet bet_command: read, check, write back, then jackpot and insert as separate commits
+        balance = db.get_gambling_balance(1, 42, starting)
+        if stake > balance:
+            return False
+        db.has_placed_any_bet(1, 42)
+        db.set_gambling_balance(1, 42, balance - stake)
+        db.update_jackpot(1, stake, "2026-01-01")
+        db.add_gambling_bet(1, 42, "user", stake, "t", 0, 0, "2026-01-01")
+        return True
+
+    def place_bet(db):
+        return db.place_bet(1, 42, "user", stake, "t", 0, 0, "2026-01-01", starting)[0]
+
+    # Only the new path is held to the invariant; the old sequence is expected to lose epochs
+    for label, attempt, checked in [("old sequence", old_sequence, False), ("place_bet", place_bet, True)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Two handles on one file so the transactions also race across connections
+            path = os.path.join(tmp, "bets.db")
+            handles = [Database(path), Database(path)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(workers) as pool:
+                placed = sum(pool.map(lambda i: attempt(handles[i % 2]), range(bets)))
+            elapsed = time.perf_counter() - start
+            db = handles[0]
+            balance = db.get_gambling_balance(1, 42, starting)
+            pot, _ = db.get_current_jackpot(1)
+            recorded = len(db.get_active_gambling_bets(1))
+            # Every epoch must be either still in the balance or in the pot, with one bet row per stake
+            consistent = balance + pot == starting and recorded * stake == pot and placed == expected
+            _report(f"{label}", elapsed, bets)
+            print(f"    placed {placed}/{expected} possible, balance {balance}, pot {pot}, bet rows {recorded} -> "
+                  f"{'consistent' if consistent else 'LOST OR DUPLICATED EPOCHS'}")
+            for handle in handles:
+                handle.close()
+            if checked:
+                assert consistent, f"{label}: balance {balance} + pot {pot} != {starting}, {recorded} bet rows, {placed} placed"
+
+
+def bench_donations(donations: int = 1000, workers: int = 32):
+    """Load test for concurrent donations to one user: old read-modify-write vs transfer_balance, checked to the epoch."""
+    amount, starting, donors = 5, 100, 100
+    recipient = 10_000
+
+    def old_donation(db, donor):
+        donor_balance = db.get_gambling_balance(1, donor, starting)
+        if donor_balance < amount:
+            return False
+        db.set_gambling_balance(1, donor, donor_balance - amount)
+        recipient_balance = db.get_gambling_balance(1, recipient, starting)
+        db.set_gambling_balance(1, recipient, recipient_balance + amount)
+        return True
+
+    def transfer(db, donor):
+        return db.transfer_balance(1, donor, recipient, amount, starting)[0]
+
+    # Only transfer_balance is held to the invariant; the old path is expected to lose updates
+    for label, donate, checked in [("old read-modify-write", old_donation, False), ("transfer_balance", transfer, True)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Two handles on one file so the transfers also race across connections
+            path = os.path.join(tmp, "donations.db")
+            handles = [Database(path), Database(path)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(workers) as pool:
+                done = sum(pool.map(lambda i: donate(handles[i % 2], i % donors), range(donations)))
+            elapsed = time.perf_counter() - start
+            db = handles[0]
+            received = db.get_gambling_balance(1, recipient, starting)
+            given = sum(starting - db.get_gambling_balance(1, donor, starting) for donor in range(donors))
+            exact = received == starting + donations * amount and given == donations * amount and done == donations
+            _report(label, elapsed, donations)
+            print(f"    recipient {received} (expected {starting + donations * amount}), donors gave {given} -> "
+                  f"{'exact' if exact else 'LOST UPDATES'}")
+            for handle in handles:
+                handle.close()
+            if checked:
+                assert exact, f"{label}: recipient {received}, donors gave {given}, {done}/{donations} completed"
+
+
+def bench_ledger(entries: int = 1_000_000, ops: int = 200):
+    """Rebuilding a balance from the ledger: full replay vs the last snapshot plus its tail, and a ledger audit."""
+    import random
+    from db import LEDGER_SNAPSHOT_EVERY
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "ledger.db"))
+
+        # Audit: drive the real write paths, then every materialized balance must match its replayed ledger
+        rng = random.Random(7)
+        users = range(50)
+        for i in range(5000):
+            user = rng.choice(users)
+            roll = rng.random()
+            if roll < 0.4:
+                db.place_bet(1, user, "user", rng.randint(1, 20), "t", i, i, "2026-01-01")
+            elif roll < 0.7:
+                db.transfer_balance(1, user, rng.choice(users), 5, entry_type="donation")
+            elif roll < 0.9:
+                db.set_gambling_balance(1, user, db.get_gambling_balance(1, user) + rng.randint(1, 50))
+            else:
+                db.claim_daily_epochs(1, user, f"day-{i}")
+        mismatched = [user for user in users if db.rebuild_balance(1, user) != db.get_gambling_balance(1, user)]
+        print(f"audit: 5000 mixed operations over {len(users)} users -> "
+              f"{'ledger matches balances' if not mismatched else f'{len(mismatched)} BALANCES DIVERGE'}")
+        assert not mismatched, f"ledger replay differs from the stored balance for users {mismatched}"
+
+        # One user with a long history, written in bulk with the snapshots the write path would have taken
+        with db._cursor() as cursor:
+            rows = ((2, 1, 1, "bench", i) for i in range(entries))
+            cursor.executemany("INSERT INTO gambling_ledger (guild_id, user_id, delta, entry_type, created_at) "
+                               "VALUES (?, ?, ?, ?, ?)", rows)
+            cursor.execute("SELECT MAX(id) FROM gambling_ledger")
+            last_id = cursor.fetchone()[0]
+            snapshot_id = last_id - (entries % LEDGER_SNAPSHOT_EVERY or LEDGER_SNAPSHOT_EVERY) + 1
+            cursor.execute("SELECT COUNT(*) FROM gambling_ledger WHERE guild_id = 2 AND id <= ?", (snapshot_id,))
+            cursor.execute("INSERT INTO gambling_balance_snapshots VALUES (2, 1, ?, ?, 0)",
+                           (cursor.fetchone()[0], snapshot_id))
+        print(f"ledger: {entries} entries for one user, snapshot every {LEDGER_SNAPSHOT_EVERY}")
+
+        def full_replay():
+            with db._cursor() as cursor:
+                cursor.execute("SELECT COALESCE(SUM(delta), 0) FROM gambling_ledger WHERE guild_id = 2 AND user_id = 1")
+                return cursor.fetchone()[0]
+
+        for label, rebuild in [("full replay", full_replay),
+                               ("snapshot + tail", lambda: db.rebuild_balance(2, 1))]:
+            start = time.perf_counter()
+            for _ in range(ops):
+                balance = rebuild()
+            _report(label, time.perf_counter() - start, ops)
+            assert balance == entries, balance
+
+        db.close()
+
+
+def bench_winners(bets: int = 100_000, ops: int = 50):
+    """Winner search and settlement for one guild's day: Python scan + per-winner lookups (old) vs indexed queries."""
+    import random
+
+    rng = random.Random(3)
+    day_start = 1_767_225_600
+    rows = [(1, user, f"user{user}", 10, "t", day_start + rng.randrange(86400), 0, "2026-01-01")
+            for user in (rng.randrange(5000) for _ in range(bets))]
+    launches = [day_start + rng.randrange(86400) for _ in range(ops)]
+
+    def old_search(db, launch):
+        # The pre-index calculate_and_announce_winners: every bet of the day into Python, then a linear scan
+        closest, min_difference = [], float('inf')
+        for user_name, bet_amount, predicted_time, predicted_timestamp in db.get_active_gambling_bets_for_day(1, "2026-01-01"):
+            difference = abs(predicted_timestamp - launch)
+            if difference < min_difference:
+                min_difference, closest = difference, [(user_name, bet_amount, predicted_timestamp)]
+            elif difference == min_difference:
+                closest.append((user_name, bet_amount, predicted_timestamp))
+        return min_difference, closest
+
+    def old_settle(db, winners):
+        # One display-name lookup and one balance write per winner, then the reset
+        for user_name, bet_amount, predicted_timestamp in winners:
+            with db._cursor() as cursor:
+                cursor.execute("SELECT user_id FROM gambling_bets WHERE guild_id = ? AND user_name = ? "
+                               "AND predicted_timestamp = ? AND betting_day = ?", (1, user_name, predicted_timestamp, "2026-01-01"))
+                user_id = cursor.fetchone()[0]
+            db.set_gambling_balance(1, user_id, db.get_gambling_balance(1, user_id) + 100)
+        with db._cursor() as cursor:
+            cursor.execute("UPDATE gambling_bets SET is_active = 0 WHERE guild_id = 1 AND betting_day = '2026-01-01'")
+
+    def new_settle(db, winners):
+        db.settle_betting_day(1, "2026-01-01", [winner[0] for winner in winners], 100)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label, indexed in [("old", False), ("indexed", True)]:
+            db = Database(os.path.join(tmp, f"{label}.db"))
+            with db._cursor() as cursor:
+                if not indexed:
+                    cursor.execute("DROP INDEX idx_bets_day")
+                    cursor.execute("DROP INDEX idx_bets_user")
+                cursor.executemany("INSERT INTO gambling_bets (guild_id, user_id, user_name, bet_amount, predicted_time, "
+                                   "predicted_timestamp, placed_at, betting_day) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                cursor.executemany("INSERT INTO gambling_balances (guild_id, user_id, balance) VALUES (1, ?, 0)",
+                                   [(user,) for user in range(5000)])
+
+            search = (lambda launch: old_search(db, launch)) if not indexed else \
+                     (lambda launch: db.find_closest_bets(1, "2026-01-01", launch))
+            start = time.perf_counter()
+            found = [search(launch) for launch in launches]
+            _report(f"winner search, {label}", time.perf_counter() - start, ops)
+            results[label] = [(difference, sorted(winner[-1] for winner in winners)) for difference, winners in found]
+
+            start = time.perf_counter()
+            (old_settle if not indexed else new_settle)(db, found[0][1])
+            _report(f"settlement of {len(found[0][1])} winner(s), {label}", time.perf_counter() - start, 1)
+            db.close()
+
+        print(f"{bets} bets, {ops} launch times -> "
+              f"{'same winners' if results['old'] == results['indexed'] else 'WINNERS DIFFER'}")
+    assert results["old"] == results["indexed"], "indexed winner search disagrees with the old full scan"
+
+
+def bench_launch(guilds: int = 500, bets_per_guild: int = 1000):
+    """Launch settlement across guilds: provisional winners for every guild in one call, then each guild's payout."""
+    import random
+
+    rng = random.Random(5)
+    day_start = 1_767_225_600
+    launch = day_start + 43_200
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "launch.db"))
+        with db._cursor() as cursor:
+            cursor.executemany("INSERT INTO guild_settings (guild_id, channel_id, gambling_channel_id) VALUES (?, ?, ?)",
+                               [(guild, guild, guild) for guild in range(guilds)])
+            cursor.executemany("INSERT INTO gambling_jackpots (guild_id, current_pot, multiplier, last_reset_day) "
+                               "VALUES (?, ?, 1, '2026-01-01')", [(guild, bets_per_guild * 10) for guild in range(guilds)])
+            cursor.executemany("INSERT INTO gambling_bets (guild_id, user_id, user_name, bet_amount, predicted_time, "
+                               "predicted_timestamp, placed_at, betting_day) VALUES (?, ?, ?, 10, 't', ?, 0, '2026-01-01')",
+                               ((guild, user, f"user{user}", day_start + rng.randrange(86400))
+                                for guild in range(guilds) for user in range(bets_per_guild)))
+            cursor.executemany("INSERT INTO gambling_balances (guild_id, user_id, balance) VALUES (?, ?, 0)",
+                               ((guild, user) for guild in range(guilds) for user in range(bets_per_guild)))
+
+        start = time.perf_counter()
+        results = db.find_launch_winners("2026-01-01", launch)
+        _report("provisional winners, all guilds", time.perf_counter() - start, 1)
+
+        start = time.perf_counter()
+        for guild_id, channel_id, jackpot_amount, min_difference, winners in results:
+            db.settle_betting_day(guild_id, "2026-01-01", [winner[0] for winner in winners], jackpot_amount // len(winners))
+        _report("settlement, per guild", time.perf_counter() - start, len(results))
+
+        repeated = sum(db.settle_betting_day(guild_id, "2026-01-01", [winners[0][0]], 1)
+                       for guild_id, _, _, _, winners in results)
+        print(f"{guilds} guilds x {bets_per_guild} bets -> {len(results)} settled, "
+              f"{'repeat settlement refused' if not repeated else f'{repeated} SETTLED TWICE'}")
+        db.close()
+
+
+BENCHMARKS = {
+    "db-ops": bench_db_ops,
+    "manifest": bench_manifest,
+    "branches": bench_branches,
+    "bets": bench_bets,
+    "donations": bench_donations,
+    "ledger": bench_ledger,
+    "winners": bench_winners,
+    "launch": bench_launch,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("Available benchmarks:")
+        for name, func in BENCHMARKS.items():
+            print(f"  {name:<16} {func.__doc__}")
+        sys.exit(1)
+    BENCHMARKS[sys.argv[1]](*(int(arg) for arg in sys.argv[2:]))
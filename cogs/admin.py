@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 import os
-from db import Database
 
 class AdminCog(commands.Cog):
     """Administrative commands for bot configuration."""
@@ -9,18 +8,15 @@ class AdminCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.command_prefix = os.environ.get("COMMAND_PREFIX", "!")
-        # Get database instance from the main bot
-        self.db = getattr(bot, 'db', None)
-        if not self.db:
-            database_file = os.environ.get("DATABASE_FILE", "bot_settings.db")
-            self.db = Database(database_file)
+        # Shared storage handle injected by the main bot
+        self.db = bot.db
 
     async def set_notification_channel(self, guild_id: int, channel_id: int):
-        self.db.set_notification_channel(guild_id, channel_id)
+        await self.db.set_notification_channel(guild_id, channel_id)
         print(f"[{discord.utils.utcnow()}] Stored channel {channel_id} for guild {guild_id} in database.")
 
     async def get_notification_channel(self, guild_id: int) -> int | None:
-        return self.db.get_notification_channel(guild_id)
+        return await self.db.get_notification_channel(guild_id)
 
     @commands.command(name="setchannel", help="Sets the channel for realm status notifications for this server. (Admin Only)")
     @commands.has_permissions(administrator=True)
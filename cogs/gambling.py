@@ -1,11 +1,48 @@
+import asyncio
 import discord
 from discord.ext import commands, tasks
-import os
-import sqlite3
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timedelta
 import pytz
 from typing import Optional
-from db import Database
+
+class LaunchSettlementView(discord.ui.View):
+    """
+    Confirm / false-alarm buttons under the provisional winners posted when a launch is verified.
+    Persistent: registered once with bot.add_view, so the buttons keep working across restarts. Everything
+    a click needs comes from the interaction (guild) and the prompt embed (launch time in its timestamp).
+    """
+    
+    def __init__(self, cog):
+        super().__init__(timeout=None)
+        self.cog = cog
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only administrators may settle or dismiss the jackpot."""
+        if interaction.user.guild_permissions.administrator:
+            return True
+        await interaction.response.send_message("❌ Only administrators can settle the jackpot.", ephemeral=True)
+        return False
+    
+    @discord.ui.button(label="Confirm winners", emoji="✅", style=discord.ButtonStyle.success, custom_id="launch_settlement:confirm")
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        guild_id = interaction.guild_id
+        launch_timestamp = int(interaction.message.embeds[0].timestamp.timestamp())
+        betting_day = datetime.fromtimestamp(launch_timestamp, pytz.timezone('US/Central')).strftime("%Y-%m-%d")
+        
+        # Betting closed at the launch and bets placed after it don't count, so this recalculation
+        # settles exactly the winners that were shown
+        winner_data = await self.cog.calculate_and_announce_winners(guild_id, launch_timestamp, betting_day)
+        if not winner_data or winner_data['jackpot_amount'] == 0 or not await self.cog.process_confirmed_winners(guild_id, winner_data):
+            await interaction.response.edit_message(content="❌ These bets have already been settled.", embed=None, view=None)
+            return
+        await interaction.response.edit_message(embed=self.cog.build_winners_embed(winner_data), view=None)
+        print(f"[{discord.utils.utcnow()}] Guild {guild_id}: launch winners confirmed by {interaction.user}.")
+    
+    @discord.ui.button(label="False alarm", emoji="🚨", style=discord.ButtonStyle.danger, custom_id="launch_settlement:false_alarm")
+    async def false_alarm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.cog.db.reopen_betting(interaction.guild_id)
+        await interaction.response.edit_message(embed=self.cog.build_false_alarm_embed(), view=None)
+        print(f"[{discord.utils.utcnow()}] Guild {interaction.guild_id}: launch marked as a false alarm by {interaction.user}.")
 
 class GamblingCog(commands.Cog):
     """Gambling system for betting on server launch times while waiting."""
@@ -15,11 +52,11 @@ class GamblingCog(commands.Cog):
         self.starting_balance = 100
         self.donation_amount = 5
         self.daily_epochs = 50
-        # Get database instance from the main bot
-        self.db = getattr(bot, 'db', None)
-        if not self.db:
-            database_file = os.environ.get("DATABASE_FILE", "bot_settings.db")
-            self.db = Database(database_file)
+        # Shared storage handle injected by the main bot
+        self.db = bot.db
+        # Buttons on launch prompts, including ones posted before a restart
+        self.launch_view = LaunchSettlementView(self)
+        bot.add_view(self.launch_view)
         
         # Start the automatic rollover task
         self.auto_rollover.start()
@@ -29,52 +66,43 @@ class GamblingCog(commands.Cog):
         central_tz = pytz.timezone('US/Central')
         return datetime.now(central_tz).strftime("%Y-%m-%d")
     
-    @tasks.loop(minutes=1)  # Check every minute
+    def get_next_rollover(self, now: Optional[datetime] = None) -> datetime:
+        """Get the next midnight Central Time as a UTC datetime. Built from the local date, so it stays on 00:00 across DST changes."""
+        central_tz = pytz.timezone('US/Central')
+        local_now = (now or datetime.now(pytz.UTC)).astimezone(central_tz)
+        next_day = local_now.date() + timedelta(days=1)
+        return central_tz.localize(datetime.combine(next_day, datetime.min.time())).astimezone(pytz.UTC)
+    
+    @tasks.loop()
     async def auto_rollover(self):
-        """Automatically perform rollover at midnight Central Time."""
-        try:
-            central_tz = pytz.timezone('US/Central')
-            now = datetime.now(central_tz)
-            
-            # Check if it's midnight (00:00) in Central Time
-            if now.hour == 0 and now.minute == 0:
-                current_day = self.get_current_day()
-                
-                # Get all guilds that have gambling channels set up
-                conn = sqlite3.connect(self.db.db_file)
-                cursor = conn.cursor()
-                cursor.execute("SELECT guild_id, gambling_channel_id FROM gambling_channels WHERE gambling_channel_id IS NOT NULL")
-                gambling_guilds = cursor.fetchall()
-                conn.close()
-                
-                # Perform rollover for each guild with gambling enabled
-                for guild_id, channel_id in gambling_guilds:
-                    try:
-                        # Get current jackpot before rollover
-                        old_amount, old_multiplier = self.db.get_current_jackpot(guild_id)
-                        
-                        # Only proceed if there was activity (jackpot exists)
-                        if old_amount > 0:
-                            # Perform rollover
-                            self.db.rollover_jackpot(guild_id, current_day)
-                            self.db.reset_daily_bets(guild_id, current_day)
-                            
-                            # Get new jackpot
-                            new_amount, new_multiplier = self.db.get_current_jackpot(guild_id)
-                            
-                            # Send rollover message to gambling channel
-                            await self.send_rollover_message(guild_id, channel_id, old_amount, old_multiplier, new_amount, new_multiplier)
-                    
-                    except Exception as e:
-                        print(f"Error performing auto-rollover for guild {guild_id}: {e}")
-                        
-        except Exception as e:
-            print(f"Error in auto_rollover task: {e}")
+        """Sleep until the next midnight Central Time, then perform the rollover for that day."""
+        next_rollover = self.get_next_rollover()
+        await discord.utils.sleep_until(next_rollover)
+        # Name the day from the deadline, not the clock, in case the sleep ends a moment early
+        central_tz = pytz.timezone('US/Central')
+        await self.perform_rollover(next_rollover.astimezone(central_tz).strftime("%Y-%m-%d"))
     
     @auto_rollover.before_loop
     async def before_auto_rollover(self):
-        """Wait until bot is ready before starting the rollover task."""
+        """Wait until bot is ready, then catch up on any rollover missed while offline."""
         await self.bot.wait_until_ready()
+        await self.perform_rollover(self.get_current_day())
+    
+    async def perform_rollover(self, current_day: str):
+        """Roll every gambling guild over to current_day and announce it. Safe to repeat for the same day."""
+        try:
+            # Get all guilds that have gambling channels set up and a jackpot to carry over
+            rolled = await self.db.rollover_jackpots(current_day)
+        except Exception as e:
+            print(f"Error in auto_rollover task: {e}")
+            return
+        
+        if rolled:
+            print(f"[{discord.utils.utcnow()}] Rolled over {len(rolled)} jackpot(s) to {current_day}")
+        
+        for guild_id, channel_id, old_amount, old_multiplier, new_amount, new_multiplier in rolled:
+            # Send rollover message to gambling channel
+            await self.send_rollover_message(guild_id, channel_id, old_amount, old_multiplier, new_amount, new_multiplier)
     
     async def send_rollover_message(self, guild_id: int, channel_id: int, old_amount: int, old_multiplier: int, new_amount: int, new_multiplier: int):
         """Send automatic rollover message to the gambling channel."""
@@ -148,16 +176,16 @@ class GamblingCog(commands.Cog):
         """Clean up when the cog is unloaded."""
         self.auto_rollover.cancel()
     
-    def is_gambling_channel(self, ctx) -> bool:
+    async def is_gambling_channel(self, ctx) -> bool:
         """Check if the command is being used in the designated gambling channel."""
-        gambling_channel_id = self.db.get_gambling_channel(ctx.guild.id)
+        gambling_channel_id = await self.db.get_gambling_channel(ctx.guild.id)
         if gambling_channel_id is None:
             return True  # No gambling channel set, allow everywhere
         return ctx.channel.id == gambling_channel_id
     
     async def send_wrong_channel_message(self, ctx):
         """Send a message directing users to the correct gambling channel."""
-        gambling_channel_id = self.db.get_gambling_channel(ctx.guild.id)
+        gambling_channel_id = await self.db.get_gambling_channel(ctx.guild.id)
         if gambling_channel_id:
             gambling_channel = ctx.guild.get_channel(gambling_channel_id)
             if gambling_channel:
@@ -345,16 +373,16 @@ class GamblingCog(commands.Cog):
     @commands.command(name="balance", help="Check your current epoch balance.")
     async def balance_command(self, ctx):
         """Check user's current epoch balance."""
-        if not self.is_gambling_channel(ctx):
+        if not await self.is_gambling_channel(ctx):
             await self.send_wrong_channel_message(ctx)
             return
             
-        balance = self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)
+        balance = await self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)
         
         # Check if user can claim daily epochs
         current_day = self.get_current_day()
-        can_claim = not self.db.has_claimed_daily(ctx.guild.id, ctx.author.id, current_day)
-        has_bet = self.db.has_placed_any_bet(ctx.guild.id, ctx.author.id)
+        can_claim = not await self.db.has_claimed_daily(ctx.guild.id, ctx.author.id, current_day)
+        has_bet = await self.db.has_placed_any_bet(ctx.guild.id, ctx.author.id)
         
         message = f"{ctx.author.mention}, you have **{balance}** epochs! 💰"
         
@@ -375,7 +403,7 @@ class GamblingCog(commands.Cog):
             )
             return
             
-        self.db.set_gambling_channel(ctx.guild.id, channel.id)
+        await self.db.set_gambling_channel(ctx.guild.id, channel.id)
         
         embed = discord.Embed(
             title="🎰 Gambling Channel Set!",
@@ -412,16 +440,17 @@ class GamblingCog(commands.Cog):
     @commands.command(name="daily", help="Claim your daily epochs.")
     async def daily_command(self, ctx):
         """Claim daily epoch allowance."""
-        if not self.is_gambling_channel(ctx):
+        if not await self.is_gambling_channel(ctx):
             await self.send_wrong_channel_message(ctx)
             return
             
         current_day = self.get_current_day()
         
-        success, reason = self.db.claim_daily_epochs(ctx.guild.id, ctx.author.id, current_day, self.daily_epochs)
+        success, reason = await self.db.claim_daily_epochs(ctx.guild.id, ctx.author.id, current_day, self.daily_epochs,
+                                                           message_id=ctx.message.id)
         
         if success:
-            new_balance = self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)
+            new_balance = await self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)
             await ctx.send(
                 f"🎁 **Daily Claim Successful!**\n"
                 f"You received **{self.daily_epochs}** epochs!\n"
@@ -429,11 +458,12 @@ class GamblingCog(commands.Cog):
                 f"*Come back tomorrow at midnight Central Time for more!* ⏰"
             )
         elif reason == "no_bets":
+            balance = await self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)
             await ctx.send(
                 f"🎯 **First Bet Required!**\n"
                 f"You need to place your first bet before you can claim daily epochs!\n\n"
                 f"Use `!bet <amount> <time>` to get started.\n"
-                f"💰 Current balance: **{self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)}** epochs"
+                f"💰 Current balance: **{balance}** epochs"
             )
         elif reason == "already_claimed":
             # Calculate time until next day (Central Time midnight)
@@ -444,10 +474,11 @@ class GamblingCog(commands.Cog):
             
             hours = time_left.seconds // 3600
             minutes = (time_left.seconds % 3600) // 60
+            balance = await self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)
             
             await ctx.send(
                 f"❌ You've already claimed your daily epochs today!\n"
-                f"💰 Current balance: **{self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)}** epochs\n\n"
+                f"💰 Current balance: **{balance}** epochs\n\n"
                 f"⏰ **Next daily claim available in:**\n"
                 f"🕐 **{hours}** hours and **{minutes}** minutes\n"
                 f"📍 Resets at **midnight Central Time**"
@@ -458,7 +489,7 @@ class GamblingCog(commands.Cog):
     @commands.command(name="bet", help="Place a bet on when the server will launch. Usage: !bet <amount> <time> [timezone]")
     async def bet_command(self, ctx, amount: int = None, *, predicted_time: str = None):
         """Place a bet on server launch time."""
-        if not self.is_gambling_channel(ctx):
+        if not await self.is_gambling_channel(ctx):
             await self.send_wrong_channel_message(ctx)
             return
             
@@ -479,12 +510,6 @@ class GamblingCog(commands.Cog):
             await ctx.send("❌ Bet amount must be greater than 0!")
             return
         
-        # Check user's balance
-        current_balance = self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)
-        if amount > current_balance:
-            await ctx.send(f"❌ You don't have enough epochs! Your balance: **{current_balance}** epochs.")
-            return
-        
         # Parse the time
         parsed_time, timezone_used = self.parse_time_input(predicted_time)
         if parsed_time is None:
@@ -503,80 +528,80 @@ class GamblingCog(commands.Cog):
             await ctx.send("❌ You can't bet on a time in the past!")
             return
         
-        # Check if this is their first bet (before placing it)
-        is_first_bet = not self.db.has_placed_any_bet(ctx.guild.id, ctx.author.id)
-        
-        # Deduct from balance
-        new_balance = current_balance - amount
-        self.db.set_gambling_balance(ctx.guild.id, ctx.author.id, new_balance)
-        
-        # Add to jackpot
+        # No new bets once a launch has been verified, until it's settled or called a false alarm
         current_day = self.get_current_day()
-        self.db.update_jackpot(ctx.guild.id, amount, current_day)
+        if await self.db.is_betting_closed(ctx.guild.id, current_day):
+            await ctx.send("🚀 A launch has been detected! Betting is closed while the winners are confirmed.")
+            return
         
-        # Add the bet
-        # Format time for storage
+        # Debit the stake, add it to the jackpot and record the bet in one transaction
         formatted_time = parsed_time.strftime("%Y-%m-%d %H:%M:%S UTC")
-        success = self.db.add_gambling_bet(
-            ctx.guild.id, 
-            ctx.author.id, 
-            ctx.author.display_name,
-            amount, 
-            formatted_time,
-            int(parsed_time.timestamp()),
-            int(datetime.now().timestamp()),
-            current_day
+        try:
+            success, new_balance, is_first_bet = await self.db.place_bet(
+                ctx.guild.id, 
+                ctx.author.id, 
+                ctx.author.display_name,
+                amount, 
+                formatted_time,
+                int(parsed_time.timestamp()),
+                int(datetime.now().timestamp()),
+                current_day,
+                self.starting_balance,
+                message_id=ctx.message.id
+            )
+        except Exception as e:
+            print(f"Error placing bet for {ctx.author.id} in guild {ctx.guild.id}: {e}")
+            await ctx.send("❌ Failed to place bet. Please try again.")
+            return
+        
+        if not success:
+            await ctx.send(f"❌ You don't have enough epochs! Your balance: **{new_balance}** epochs.")
+            return
+        
+        # Show timezone conversion information
+        timezone_display = {
+            'US/Eastern': 'Eastern',
+            'US/Central': 'Central', 
+            'US/Mountain': 'Mountain',
+            'US/Pacific': 'Pacific',
+            'UTC': 'UTC'
+        }.get(timezone_used, timezone_used)
+        
+        input_tz = pytz.timezone(timezone_used)
+        input_time = parsed_time.astimezone(input_tz)
+        input_time_str = input_time.strftime("%H:%M")
+        utc_time_str = parsed_time.strftime("%H:%M UTC")
+        
+        # Check if this was their first bet
+        message = (
+            f"✅ **Bet placed!**\n"
+            f"💰 Amount: **{amount}** epochs\n"
+            f"🕐 Your input: **{input_time_str} {timezone_display}** → **{utc_time_str}**\n"
+            f"💳 Remaining balance: **{new_balance}** epochs\n\n"
+            f"*Good luck! May the odds be ever in your favor!* 🎰"
         )
         
-        if success:
-            # Show timezone conversion information
-            timezone_display = {
-                'US/Eastern': 'Eastern',
-                'US/Central': 'Central', 
-                'US/Mountain': 'Mountain',
-                'US/Pacific': 'Pacific',
-                'UTC': 'UTC'
-            }.get(timezone_used, timezone_used)
-            
-            input_tz = pytz.timezone(timezone_used)
-            input_time = parsed_time.astimezone(input_tz)
-            input_time_str = input_time.strftime("%H:%M")
-            utc_time_str = parsed_time.strftime("%H:%M UTC")
-            
-            # Check if this was their first bet
-            message = (
-                f"✅ **Bet placed!**\n"
-                f"💰 Amount: **{amount}** epochs\n"
-                f"🕐 Your input: **{input_time_str} {timezone_display}** → **{utc_time_str}**\n"
-                f"💳 Remaining balance: **{new_balance}** epochs\n\n"
-                f"*Good luck! May the odds be ever in your favor!* 🎰"
+        if is_first_bet:
+            message += (
+                f"\n\n🎉 **First bet bonus!**\n"
+                f"You've unlocked daily epoch claims!\n"
+                f"Use `!daily` to claim your epochs every day at midnight Central Time!"
             )
-            
-            if is_first_bet:
-                message += (
-                    f"\n\n🎉 **First bet bonus!**\n"
-                    f"You've unlocked daily epoch claims!\n"
-                    f"Use `!daily` to claim your epochs every day at midnight Central Time!"
-                )
-            
-            await ctx.send(message)
-        else:
-            # Refund if bet failed to save
-            self.db.set_gambling_balance(ctx.guild.id, ctx.author.id, current_balance)
-            await ctx.send("❌ Failed to place bet. Please try again.")
+        
+        await ctx.send(message)
     
     @commands.command(name="bets", help="View all active bets.")
     async def bets_command(self, ctx):
         """Display all active bets."""
-        if not self.is_gambling_channel(ctx):
+        if not await self.is_gambling_channel(ctx):
             await self.send_wrong_channel_message(ctx)
             return
             
         current_day = self.get_current_day()
-        bets = self.db.get_active_gambling_bets_for_day(ctx.guild.id, current_day)
+        bets = await self.db.get_active_gambling_bets_for_day(ctx.guild.id, current_day)
         
         # Get current jackpot info
-        jackpot_amount, multiplier = self.db.get_current_jackpot(ctx.guild.id)
+        jackpot_amount, multiplier = await self.db.get_current_jackpot(ctx.guild.id)
         
         embed = discord.Embed(
             title="🎰 Today's Server Launch Bets",
@@ -629,8 +654,8 @@ class GamblingCog(commands.Cog):
     async def rules_command(self, ctx):
         """Display gambling rules or redirect to gambling channel."""
         # Check if we're in the gambling channel
-        if not self.is_gambling_channel(ctx):
-            gambling_channel_id = self.db.get_gambling_channel(ctx.guild.id)
+        if not await self.is_gambling_channel(ctx):
+            gambling_channel_id = await self.db.get_gambling_channel(ctx.guild.id)
             if gambling_channel_id:
                 gambling_channel = ctx.guild.get_channel(gambling_channel_id)
                 if gambling_channel:
@@ -745,11 +770,11 @@ class GamblingCog(commands.Cog):
     @commands.command(name="broke", help="Request epoch donations from other users.")
     async def broke_command(self, ctx):
         """Request donations when user is broke."""
-        if not self.is_gambling_channel(ctx):
+        if not await self.is_gambling_channel(ctx):
             await self.send_wrong_channel_message(ctx)
             return
             
-        balance = self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)
+        balance = await self.db.get_gambling_balance(ctx.guild.id, ctx.author.id, self.starting_balance)
         
         if balance > 0:
             await ctx.send(f"💰 You still have **{balance}** epochs! You're not broke yet!")
@@ -786,11 +811,11 @@ class GamblingCog(commands.Cog):
     @commands.command(name="jackpot", help="View current jackpot status.")
     async def jackpot_command(self, ctx):
         """Display current jackpot information."""
-        if not self.is_gambling_channel(ctx):
+        if not await self.is_gambling_channel(ctx):
             await self.send_wrong_channel_message(ctx)
             return
             
-        jackpot_amount, multiplier = self.db.get_current_jackpot(ctx.guild.id)
+        jackpot_amount, multiplier = await self.db.get_current_jackpot(ctx.guild.id)
         
         embed = discord.Embed(
             title="💰 Current Jackpot Status",
@@ -830,29 +855,17 @@ class GamblingCog(commands.Cog):
     
     async def calculate_and_announce_winners(self, guild_id: int, actual_launch_time: int, betting_day: str):
         """Calculate winners and announce them."""
-        # Get all bets for today
-        bets = self.db.get_active_gambling_bets_for_day(guild_id, betting_day)
+        # Closest bet(s) to the launch, found with an indexed nearest-neighbour search
+        min_difference, closest_bets = await self.db.find_closest_bets(guild_id, betting_day, actual_launch_time)
         
-        if not bets:
+        if not closest_bets:
             return None  # No bets to process
         
-        # Calculate closest bet(s)
-        closest_bets = []
-        min_difference = float('inf')
-        
-        for user_name, bet_amount, predicted_time, predicted_timestamp in bets:
-            difference = abs(predicted_timestamp - actual_launch_time)
-            if difference < min_difference:
-                min_difference = difference
-                closest_bets = [(user_name, bet_amount, predicted_timestamp)]
-            elif difference == min_difference:
-                closest_bets.append((user_name, bet_amount, predicted_timestamp))
-        
         # Get current jackpot
-        jackpot_amount, multiplier = self.db.get_current_jackpot(guild_id)
+        jackpot_amount, multiplier = await self.db.get_current_jackpot(guild_id)
         
         # Calculate payout per winner
-        payout_per_winner = jackpot_amount // len(closest_bets) if closest_bets else 0
+        payout_per_winner = jackpot_amount // len(closest_bets)
         
         return {
             'winners': closest_bets,
@@ -865,46 +878,14 @@ class GamblingCog(commands.Cog):
 
     async def process_confirmed_winners(self, guild_id: int, winner_data: dict):
         """Process the actual winner payouts after admin confirmation."""
-        winners = winner_data['winners']
-        payout_per_winner = winner_data['payout_per_winner']
-        betting_day = winner_data['betting_day']
-        
-        # Pay out winners
-        for user_name, bet_amount, predicted_timestamp in winners:
-            # Get user_id from the bet
-            conn = sqlite3.connect(self.db.db_file)
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT user_id FROM gambling_bets WHERE guild_id = ? AND user_name = ? AND predicted_timestamp = ? AND betting_day = ?",
-                (guild_id, user_name, predicted_timestamp, betting_day)
-            )
-            result = cursor.fetchone()
-            conn.close()
-            
-            if result:
-                user_id = result[0]
-                current_balance = self.db.get_gambling_balance(guild_id, user_id, self.starting_balance)
-                new_balance = current_balance + payout_per_winner
-                self.db.set_gambling_balance(guild_id, user_id, new_balance)
-        
-        # Reset jackpot and deactivate bets
-        conn = sqlite3.connect(self.db.db_file)
-        cursor = conn.cursor()
-        
-        # Reset jackpot
-        cursor.execute(
-            "INSERT OR REPLACE INTO gambling_jackpots (guild_id, current_pot, multiplier, last_reset_day) VALUES (?, 0, 1, ?)",
-            (guild_id, betting_day)
-        )
-        
-        # Deactivate all bets for this day
-        cursor.execute(
-            "UPDATE gambling_bets SET is_active = 0 WHERE guild_id = ? AND betting_day = ?",
-            (guild_id, betting_day)
+        # Pay every winning bet, reset the jackpot and deactivate the day's bets in one transaction.
+        # Returns False if the day was already settled (e.g. by another admin or the launch prompt).
+        return await self.db.settle_betting_day(
+            guild_id,
+            winner_data['betting_day'],
+            [user_id for user_id, user_name, bet_amount, predicted_timestamp in winner_data['winners']],
+            winner_data['payout_per_winner']
         )
-        
-        conn.commit()
-        conn.close()
 
     @commands.command(name="confirm-winner", help="[Admin] Confirm the calculated winner after server launch.")
     @commands.has_permissions(administrator=True)
@@ -946,9 +927,14 @@ class GamblingCog(commands.Cog):
             return
         
         # Process payouts
-        await self.process_confirmed_winners(ctx.guild.id, winner_data)
+        if not await self.process_confirmed_winners(ctx.guild.id, winner_data):
+            await ctx.send("❌ Today's bets have already been settled!")
+            return
         
-        # Create winner announcement
+        await ctx.send(embed=self.build_winners_embed(winner_data))
+
+    def build_winners_embed(self, winner_data: dict) -> discord.Embed:
+        """Build the winner announcement for a settled day."""
         winners = winner_data['winners']
         jackpot_amount = winner_data['jackpot_amount']
         payout_per_winner = winner_data['payout_per_winner']
@@ -972,14 +958,14 @@ class GamblingCog(commands.Cog):
         
         # Winner list
         if len(winners) == 1:
-            winner_name = winners[0][0]
+            winner_name = winners[0][1]
             embed.add_field(
                 name="🏆 Winner",
                 value=f"**{winner_name}** wins it all!",
                 inline=False
             )
         else:
-            winner_names = [winner[0] for winner in winners]
+            winner_names = [winner[1] for winner in winners]
             embed.add_field(
                 name="🏆 Winners (Tie!)",
                 value=f"**{', '.join(winner_names)}** split the jackpot!",
@@ -1012,12 +998,17 @@ class GamblingCog(commands.Cog):
         
         embed.set_footer(text="🎲 Congratulations to the winners! Better luck next time everyone else!")
         
-        await ctx.send(embed=embed)
+        return embed
 
     @commands.command(name="false-alarm", help="[Admin] Cancel winner calculation if server launch was a false positive.")
     @commands.has_permissions(administrator=True)
     async def false_alarm_command(self, ctx):
         """Cancel winner calculation for false server launch detection."""
+        await self.db.reopen_betting(ctx.guild.id)
+        await ctx.send(embed=self.build_false_alarm_embed())
+
+    def build_false_alarm_embed(self) -> discord.Embed:
+        """Build the notice that a detected launch was a false positive."""
         embed = discord.Embed(
             title="🚨 False Alarm Confirmed",
             description="The server launch detection was a false positive.",
@@ -1041,7 +1032,82 @@ class GamblingCog(commands.Cog):
             inline=False
         )
         
-        await ctx.send(embed=embed)
+        return embed
+
+    @commands.Cog.listener()
+    async def on_realm_launch_verified(self, launch_timestamp: int):
+        """Post provisional winners with a one-click confirm in every gambling channel once a launch is verified."""
+        central_tz = pytz.timezone('US/Central')
+        betting_day = datetime.fromtimestamp(launch_timestamp, central_tz).strftime("%Y-%m-%d")
+        
+        # Closest bets for every guild's day in one database call
+        try:
+            results = await self.db.find_launch_winners(betting_day, launch_timestamp)
+        except Exception as e:
+            print(f"Error calculating launch winners: {e}")
+            return
+        
+        # Close the day before the prompts go out; stored so a restart doesn't reopen betting
+        try:
+            await self.db.close_betting_day([result[0] for result in results], betting_day)
+        except Exception as e:
+            print(f"Error closing betting for {betting_day}: {e}")
+        
+        prompts = []
+        for guild_id, channel_id, jackpot_amount, min_difference, winners in results:
+            winner_data = {
+                'winners': winners,
+                'jackpot_amount': jackpot_amount,
+                'payout_per_winner': jackpot_amount // len(winners),
+                'min_difference': min_difference,
+                'actual_launch_time': launch_timestamp,
+                'betting_day': betting_day
+            }
+            prompts.append(self.send_launch_prompt(guild_id, channel_id, winner_data))
+        await asyncio.gather(*prompts)
+        
+        if results:
+            print(f"[{discord.utils.utcnow()}] Posted provisional launch winners to {len(results)} guild(s) for {betting_day}.")
+    
+    async def send_launch_prompt(self, guild_id: int, channel_id: int, winner_data: dict):
+        """Send the provisional winners for a detected launch, with confirm and false-alarm buttons for admins."""
+        try:
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                return
+            
+            winner_names = [winner[1] for winner in winner_data['winners']]
+            embed = discord.Embed(
+                title="🚀 Launch Detected - Provisional Winners",
+                description=(
+                    f"Auth and Kezan were verified online at <t:{winner_data['actual_launch_time']}:T>.\n"
+                    f"An administrator must confirm before the jackpot is paid out."
+                ),
+                color=0x00bfff,
+                # The buttons read the launch time back from here
+                timestamp=datetime.fromtimestamp(winner_data['actual_launch_time'], pytz.UTC)
+            )
+            embed.add_field(
+                name="🏆 Closest Bet" if len(winner_names) == 1 else "🏆 Closest Bets (Tie!)",
+                value=f"**{', '.join(winner_names)}**",
+                inline=False
+            )
+            embed.add_field(
+                name="💰 Jackpot Total",
+                value=f"**{winner_data['jackpot_amount']}** epochs",
+                inline=True
+            )
+            embed.add_field(
+                name="💵 Payout Each",
+                value=f"**{winner_data['payout_per_winner']}** epochs",
+                inline=True
+            )
+            embed.set_footer(text="✅ Confirm winners pays out now • 🚨 False alarm keeps all bets active")
+            
+            await channel.send(embed=embed, view=self.launch_view)
+        
+        except Exception as e:
+            print(f"Error sending launch prompt to guild {guild_id}: {e}")
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
@@ -1068,17 +1134,15 @@ class GamblingCog(commands.Cog):
                         await message.remove_reaction(payload.emoji, payload.member)
                         return
                     
-                    # Check if donor has enough epochs
-                    donor_balance = self.db.get_gambling_balance(payload.guild_id, donor_id, self.starting_balance)
-                    if donor_balance < self.donation_amount:
+                    # Move the donation in one transaction; refuse if the donor can't cover it
+                    success, _, _ = await self.db.transfer_balance(
+                        payload.guild_id, donor_id, broke_user_id, self.donation_amount, self.starting_balance,
+                        entry_type="donation", message_id=payload.message_id
+                    )
+                    if not success:
                         await message.remove_reaction(payload.emoji, payload.member)
                         return
                     
-                    # Process donation
-                    self.db.set_gambling_balance(payload.guild_id, donor_id, donor_balance - self.donation_amount)
-                    broke_balance = self.db.get_gambling_balance(payload.guild_id, broke_user_id, self.starting_balance)
-                    self.db.set_gambling_balance(payload.guild_id, broke_user_id, broke_balance + self.donation_amount)
-                    
                     # Count total donations
                     reaction_count = 0
                     for reaction in message.reactions:
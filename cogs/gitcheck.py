@@ -1,10 +1,155 @@
 import discord
-from discord.ext import commands
-import requests
+from discord.ext import commands, tasks
+import aiohttp
 import json
+import os
+import statistics
+import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Tuple, Dict, List
+from urllib.parse import urlencode
 import asyncio
+from server_status import get_http_session
+
+# GitHub requests share the bot's pooled HTTP session
+GITHUB_TIMEOUT = aiohttp.ClientTimeout(total=10)
+try:
+    # Seconds a cached response is served without asking GitHub at all
+    GITHUB_CACHE_TTL = float(os.environ.get("GITHUB_CACHE_TTL", "60"))
+    # Below this many remaining API requests, cached responses are served instead of spending more
+    GITHUB_RATE_LIMIT_RESERVE = int(os.environ.get("GITHUB_RATE_LIMIT_RESERVE", "10"))
+except ValueError:
+    GITHUB_CACHE_TTL, GITHUB_RATE_LIMIT_RESERVE = 60.0, 10
+try:
+    # How often the commit watcher checks every watched branch (one request per branch per interval)
+    GIT_WATCH_INTERVAL = int(os.environ.get("GIT_WATCH_INTERVAL", "300"))
+except ValueError:
+    GIT_WATCH_INTERVAL = 300
+
+API_HEADERS = {
+    'Accept': 'application/vnd.github.v3+json',
+    'User-Agent': 'EpochStatusBot'
+}
+# Optional: a token raises the API limit from 60 to 5000 requests an hour
+if os.environ.get("GITHUB_TOKEN"):
+    API_HEADERS['Authorization'] = f"Bearer {os.environ['GITHUB_TOKEN']}"
+
+# Push events fetched per branch lookup; enough to skip past main/master activity
+BRANCH_ACTIVITY_PAGE_SIZE = 30
+
+def parse_repo_spec(spec: str) -> Tuple[str, str]:
+    """Split "owner/repo:branch" into (repo_path, branch); the branch defaults to main."""
+    if ':' in spec:
+        repo_path, branch = spec.split(':', 1)
+        return repo_path, branch
+    return spec, 'main'
+
+def parse_branch_activity(events: list, exclude: set) -> List[dict]:
+    """
+    Turn repository activity events (newest first) into recently pushed branches, newest first.
+    Each branch appears once with its latest push time and pusher; deleted branches are skipped.
+    """
+    branches = {}
+    seen = set(exclude)
+    for event in events:
+        ref = event.get('ref') or ''
+        if not ref.startswith('refs/heads/'):
+            continue
+        name = ref[len('refs/heads/'):]
+        if name in seen:
+            continue
+        seen.add(name)
+        if event.get('activity_type') == 'branch_deletion':
+            continue
+        branches[name] = {
+            'branch_name': name,
+            'date': event.get('timestamp', ''),
+            'author': (event.get('actor') or {}).get('login', 'Unknown')
+        }
+    return sorted(branches.values(), key=lambda branch: branch['date'], reverse=True)
+
+class GitHubCache:
+    """
+    Response cache for GitHub requests, keyed by URL and query parameters.
+    Expired entries are revalidated with ETag/Last-Modified (a 304 does not count against the
+    rate limit), and served stale when a request fails or the API budget is nearly spent.
+    """
+
+    def __init__(self, ttl: float, reserve: int):
+        self.ttl = ttl
+        self.reserve = reserve
+        self.entries: Dict[str, dict] = {}
+        self.rate_limit_remaining: Optional[int] = None
+        self.rate_limit_reset = 0.0  # Unix time the API budget refills
+        self.stats = {"fresh": 0, "not_modified": 0, "fetched": 0, "stale": 0}
+
+    def budget_low(self) -> bool:
+        """True while the remaining API budget is at or below the reserve and has not reset yet."""
+        return (self.rate_limit_remaining is not None
+                and self.rate_limit_remaining <= self.reserve
+                and time.time() < self.rate_limit_reset)
+
+    def _update_rate_limit(self, headers):
+        try:
+            self.rate_limit_remaining = int(headers["X-RateLimit-Remaining"])
+            self.rate_limit_reset = float(headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            pass
+
+    def _serve_stale(self, key: str, entry: dict, reason: str) -> Tuple[int, object]:
+        self.stats["stale"] += 1
+        print(f"[{discord.utils.utcnow()}] GitHub: serving cached {key} ({reason}, {int(time.monotonic() - entry['fetched_at'])}s old)")
+        return 200, entry["body"]
+
+    async def get(self, url: str, headers: dict, params: Optional[dict] = None) -> Tuple[int, Optional[object]]:
+        """GET through the cache. Returns (status, body); body is None unless the status is 200."""
+        key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        entry = self.entries.get(key)
+        if entry and time.monotonic() - entry["fetched_at"] < self.ttl:
+            self.stats["fresh"] += 1
+            return 200, entry["body"]
+
+        is_api = url.startswith("https://api.github.com/")
+        if is_api and self.budget_low():
+            if entry:
+                return self._serve_stale(key, entry, f"{self.rate_limit_remaining} API requests left")
+            print(f"[{discord.utils.utcnow()}] GitHub: skipping {key}, rate limit nearly spent and nothing cached")
+            return 429, None
+
+        request_headers = dict(headers)
+        if entry:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            session = await get_http_session()
+            async with session.get(url, headers=request_headers, params=params, timeout=GITHUB_TIMEOUT) as response:
+                if is_api:
+                    self._update_rate_limit(response.headers)
+                if response.status == 304 and entry:
+                    self.stats["not_modified"] += 1
+                    entry["fetched_at"] = time.monotonic()
+                    return 200, entry["body"]
+                if response.status != 200:
+                    if entry:
+                        return self._serve_stale(key, entry, f"HTTP {response.status}")
+                    return response.status, None
+                body = await response.json()
+                self.stats["fetched"] += 1
+                self.entries[key] = {
+                    "body": body,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "fetched_at": time.monotonic()
+                }
+                return 200, body
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if entry:
+                return self._serve_stale(key, entry, repr(e))
+            raise
 
 class GitCheckCog(commands.Cog):
     """GitHub repository check system for monitoring recent commits."""
@@ -17,6 +162,23 @@ class GitCheckCog(commands.Cog):
             "Project-Epoch/TrinityCore:epoch-core",
             "Project-Epoch/tswow:epoch"
         ]
+        
+        # End-to-end !gitcheck latencies (seconds), most recent last
+        self.command_latencies = deque(maxlen=100)
+        self.github = GitHubCache(GITHUB_CACHE_TTL, GITHUB_RATE_LIMIT_RESERVE)
+        # Shared storage handle injected by the main bot
+        self.db = bot.db
+        
+        # Start the background commit watcher
+        self.watch_commits.start()
+    
+    def cog_unload(self):
+        """Clean up when the cog is unloaded."""
+        self.watch_commits.cancel()
+    
+    async def fetch(self, url: str, headers: dict, params: Optional[dict] = None) -> Tuple[int, Optional[object]]:
+        """GET a GitHub URL through the response cache. Returns (status, body); body is None unless the status is 200."""
+        return await self.github.get(url, headers, params)
     
     def format_time_ago(self, commit_date: str) -> str:
         """Format the time difference between now and the commit date."""
@@ -68,15 +230,10 @@ class GitCheckCog(commands.Cog):
             url = f"https://api.github.com/repos/{repo_path}/commits"
             params = {'sha': branch, 'per_page': 1}
             
-            headers = {
-                'Accept': 'application/vnd.github.v3+json',
-                'User-Agent': 'EpochStatusBot'
-            }
-            
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            
-            commits = response.json()
+            status, commits = await self.fetch(url, API_HEADERS, params)
+            if status != 200:
+                print(f"Error fetching commits for {repo}: HTTP {status}")
+                return None
             if not commits:
                 return None
                 
@@ -94,8 +251,8 @@ class GitCheckCog(commands.Cog):
                 'commits_url': f"https://github.com/{repo_path}/commits/{branch}"
             }
             
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching commits for {repo}: {e}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching commits for {repo}: {e!r}")
             return None
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON for {repo}: {e}")
@@ -104,101 +261,243 @@ class GitCheckCog(commands.Cog):
             print(f"Unexpected error for {repo}: {e}")
             return None
 
-    async def get_latest_branch(self, repo_path: str) -> Optional[dict]:
-        """Get the latest active branch for a repository."""
+    async def get_latest_branch(self, repo: str) -> Optional[dict]:
+        """Get the most recently pushed development branch for a repository (excluding main/master and the tracked branch)."""
         try:
-            # Remove branch info if present (e.g., "Project-Epoch/TrinityCore:epoch-core" -> "Project-Epoch/TrinityCore")
-            if ':' in repo_path:
-                repo_path = repo_path.split(':', 1)[0]
-            
-            headers = {
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            # Get the active branches page
-            branches_url = f"https://github.com/{repo_path}/branches/active"
-            response = requests.get(branches_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # Parse HTML to find branch information from the table
-            html_content = response.text
-            
-            import re
-            
-            # Try multiple patterns to find branch links
-            patterns = [
-                r'<a[^>]*href="/' + re.escape(repo_path) + r'/tree/([^"]+)"[^>]*>([^<]+)</a>',
-                r'href="/' + re.escape(repo_path) + r'/tree/([^"]+)"',
-                r'/tree/([^"]+)"[^>]*>([^<]+)</a>'
-            ]
+            repo_path, tracked_branch = parse_repo_spec(repo)
             
-            branch_matches = []
-            for pattern in patterns:
-                matches = re.findall(pattern, html_content)
-                if matches:
-                    branch_matches = matches
-                    break
+            # One bounded response: the latest push activity, newest first
+            url = f"https://api.github.com/repos/{repo_path}/activity"
+            status, events = await self.fetch(url, API_HEADERS, {'per_page': BRANCH_ACTIVITY_PAGE_SIZE})
+            if status != 200:
+                print(f"Error fetching branch info for {repo_path}: HTTP {status}")
+                return None
             
-            if not branch_matches:
+            branches = parse_branch_activity(events or [], exclude={'main', 'master', tracked_branch})
+            if not branches:
                 return {
                     'branch_name': 'No active branches found',
                     'branch_url': f"https://github.com/{repo_path}/branches/active"
                 }
             
-            # Find the first non-main/master branch
-            target_branch = None
-            for branch_match in branch_matches:
-                branch_name = branch_match[0] if isinstance(branch_match, tuple) else branch_match
-                if branch_name not in ['main', 'master']:
-                    target_branch = branch_name
-                    break
-            
-            if not target_branch:
-                return {
-                    'branch_name': 'Only main/master branches found',
-                    'branch_url': f"https://github.com/{repo_path}/branches/active"
-                }
-            
-            # Get the latest commit info for this branch to check recency and get author
-            branch_commit_info = None
-            if target_branch:
-                try:
-                    commit_url = f"https://api.github.com/repos/{repo_path}/commits/{target_branch}"
-                    commit_headers = {
-                        'Accept': 'application/vnd.github.v3+json',
-                        'User-Agent': 'EpochStatusBot'
-                    }
-                    commit_response = requests.get(commit_url, headers=commit_headers, timeout=10)
-                    if commit_response.status_code == 200:
-                        commit_data = commit_response.json()
-                        branch_commit_info = {
-                            'author': commit_data['commit']['author']['name'],
-                            'date': commit_data['commit']['author']['date']
-                        }
-                except:
-                    pass  # If we can't get branch commit info, continue without it
-            
+            latest = branches[0]
             return {
-                'branch_name': target_branch,
-                'branch_url': f"https://github.com/{repo_path}/tree/{target_branch}",
-                'branch_commit': branch_commit_info
+                'branch_name': latest['branch_name'],
+                'branch_url': f"https://github.com/{repo_path}/tree/{latest['branch_name']}",
+                'branch_commit': {
+                    'author': latest['author'],
+                    'date': latest['date']
+                }
             }
             
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching branch info for {repo_path}: {e}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching branch info for {repo}: {e!r}")
             return None
         except json.JSONDecodeError as e:
-            print(f"Error parsing branch JSON for {repo_path}: {e}")
+            print(f"Error parsing branch JSON for {repo}: {e}")
             return None
         except Exception as e:
-            print(f"Unexpected error fetching branch info for {repo_path}: {e}")
+            print(f"Unexpected error fetching branch info for {repo}: {e}")
+            return None
+
+    async def check_repo(self, repo: str) -> dict:
+        """Fetch a repository's latest commit and its latest active branch concurrently."""
+        commit_data, branch_info = await asyncio.gather(
+            self.get_latest_commit(repo),
+            self.get_latest_branch(repo)
+        )
+        if not commit_data:
+            return {'repo': repo, 'error': True}
+        commit_data['branch_info'] = branch_info
+        return commit_data
+    
+    def log_command_latency(self, elapsed: float):
+        """Record one !gitcheck latency and log it with the running median and max."""
+        self.command_latencies.append(elapsed)
+        latencies = self.command_latencies
+        stats = self.github.stats
+        print(f"[{discord.utils.utcnow()}] !gitcheck took {elapsed:.2f}s (last {len(latencies)} - median: {statistics.median(latencies):.2f}s, max: {max(latencies):.2f}s)")
+        print(f"[{discord.utils.utcnow()}] GitHub cache: {stats['fresh']} fresh, {stats['not_modified']} revalidated, {stats['fetched']} fetched, {stats['stale']} stale; {self.github.rate_limit_remaining} API requests left")
+    
+    # --- Background Commit Watcher ---
+    
+    async def get_branch_head(self, repo_path: str, branch: str) -> Optional[dict]:
+        """Get the full SHA and URL of a branch's head commit."""
+        status, commit = await self.fetch(f"https://api.github.com/repos/{repo_path}/commits/{branch}", API_HEADERS)
+        if status != 200 or not commit:
+            return None
+        return {'sha': commit['sha'], 'url': commit['html_url']}
+    
+    async def get_commits_between(self, repo_path: str, old_sha: str, new_sha: str) -> Optional[dict]:
+        """Get the commits after old_sha up to new_sha (oldest first), or None if GitHub can't compare them."""
+        status, comparison = await self.fetch(f"https://api.github.com/repos/{repo_path}/compare/{old_sha}...{new_sha}", API_HEADERS)
+        if status != 200 or not comparison:
             return None
+        return comparison
+    
+    def build_new_commits_embed(self, spec: str, head: dict, old_sha: str, comparison: Optional[dict]) -> discord.Embed:
+        """Embed listing the commits between the last seen head and the new one, newest first."""
+        repo_path, branch = parse_repo_spec(spec)
+        embed = discord.Embed(
+            title=f"📦 New commits on {repo_path} ({branch})",
+            url=comparison['html_url'] if comparison else head['url'],
+            color=0x28a745,  # GitHub green
+            timestamp=datetime.now(timezone.utc)
+        )
+        
+        if comparison and comparison.get('commits'):
+            commits = comparison['commits'][::-1]
+            lines = []
+            for commit in commits[:10]:
+                message = commit['commit']['message'].split('\n')[0]
+                if len(message) > 60:
+                    message = message[:57] + "..."
+                lines.append(f"[`{commit['sha'][:7]}`]({commit['html_url']}) {message} - *{commit['commit']['author']['name']}*")
+            total = comparison.get('total_commits', len(commits))
+            if total > 10:
+                lines.append(f"... and {total - 10} more commits")
+            embed.description = "\n".join(lines)
+        else:
+            # History was rewritten or the compare failed - just point at the new head
+            embed.description = f"Branch moved from `{old_sha[:7]}` to [`{head['sha'][:7]}`]({head['url']})"
+        
+        embed.set_footer(
+            text="Project Epoch development watch",
+            icon_url="https://github.githubassets.com/images/modules/logos_page/GitHub-Mark.png"
+        )
+        return embed
+    
+    async def check_watched_branch(self, spec: str, last_sha: Optional[str]) -> Optional[discord.Embed]:
+        """Check one watched branch; stores the new head and returns an embed if it moved."""
+        repo_path, branch = parse_repo_spec(spec)
+        head = await self.get_branch_head(repo_path, branch)
+        if head is None or head['sha'] == last_sha:
+            return None
+        
+        await self.db.save_git_watch_sha(repo_path, branch, head['sha'])
+        if last_sha is None:
+            # First time this branch is watched - record it without announcing its whole history
+            return None
+        
+        comparison = await self.get_commits_between(repo_path, last_sha, head['sha'])
+        print(f"[{discord.utils.utcnow()}] New commits on {spec}: {last_sha[:7]} -> {head['sha'][:7]}")
+        return self.build_new_commits_embed(spec, head, last_sha, comparison)
+    
+    @tasks.loop(seconds=GIT_WATCH_INTERVAL)
+    async def watch_commits(self):
+        """
+        Check every watched branch once per interval and post new commits to subscribed channels.
+        Each branch is fetched once no matter how many guilds watch it.
+        """
+        try:
+            subscriptions = dict(await self.db.get_git_subscriptions())
+            if not subscriptions:
+                return
+            
+            # spec -> guilds to notify; default repos go to every subscribed guild
+            targets = {spec: set(subscriptions) for spec in self.default_repos}
+            for guild_id, spec in await self.db.get_watched_repos():
+                if guild_id in subscriptions:
+                    targets.setdefault(spec, set()).add(guild_id)
+            
+            last_seen = await self.db.get_git_watch_state()
+            specs = list(targets)
+            results = await asyncio.gather(
+                *(self.check_watched_branch(spec, last_seen.get(parse_repo_spec(spec))) for spec in specs),
+                return_exceptions=True
+            )
+            
+            sends = []
+            for spec, result in zip(specs, results):
+                if isinstance(result, Exception):
+                    print(f"[{discord.utils.utcnow()}] Commit watch failed for {spec}: {result!r}")
+                    continue
+                if result is None:
+                    continue
+                for guild_id in targets[spec]:
+                    channel = self.bot.get_channel(subscriptions[guild_id])
+                    if channel:
+                        sends.append(channel.send(embed=result))
+            
+            if sends:
+                for error in await asyncio.gather(*sends, return_exceptions=True):
+                    if isinstance(error, Exception):
+                        print(f"[{discord.utils.utcnow()}] Error sending commit notification: {error}")
+        except Exception as e:
+            print(f"[{discord.utils.utcnow()}] Error in watch_commits task: {e}")
+    
+    @watch_commits.before_loop
+    async def before_watch_commits(self):
+        """Wait until bot is ready before starting the commit watcher."""
+        await self.bot.wait_until_ready()
+    
+    @commands.command(name="set-git-channel", help="[Admin] Post new Project Epoch commits to a channel. Usage: !set-git-channel <#channel>")
+    @commands.has_permissions(administrator=True)
+    async def set_git_channel_command(self, ctx, channel: discord.TextChannel = None):
+        """Subscribe a channel to new-commit notifications."""
+        if channel is None:
+            await ctx.send("❌ Usage: `!set-git-channel <#channel>`")
+            return
+        await self.db.set_git_channel(ctx.guild.id, channel.id)
+        await ctx.send(f"✅ New commits on watched repositories will be posted in {channel.mention}.")
+    
+    @commands.command(name="remove-git-channel", help="[Admin] Stop posting new commits in this server.")
+    @commands.has_permissions(administrator=True)
+    async def remove_git_channel_command(self, ctx):
+        """Unsubscribe this server from new-commit notifications."""
+        if await self.db.remove_git_channel(ctx.guild.id):
+            await ctx.send("✅ Commit notifications turned off for this server.")
+        else:
+            await ctx.send("ℹ️ Commit notifications were not set up for this server.")
+    
+    @commands.command(name="gitwatch-add", help="[Admin] Watch another repository branch. Usage: !gitwatch-add owner/repo:branch")
+    @commands.has_permissions(administrator=True)
+    async def gitwatch_add_command(self, ctx, spec: str = None):
+        """Watch an extra repository branch for this server."""
+        if spec is None or '/' not in spec:
+            await ctx.send("❌ Usage: `!gitwatch-add owner/repo:branch` (branch defaults to main)")
+            return
+        repo_path, branch = parse_repo_spec(spec)
+        if await self.get_branch_head(repo_path, branch) is None:
+            await ctx.send(f"❌ Could not find branch `{branch}` on `{repo_path}`.")
+            return
+        spec = f"{repo_path}:{branch}"
+        if await self.db.add_watched_repo(ctx.guild.id, spec):
+            await ctx.send(f"✅ Now watching `{spec}`.")
+        else:
+            await ctx.send(f"ℹ️ `{spec}` is already being watched.")
+    
+    @commands.command(name="gitwatch-remove", help="[Admin] Stop watching a repository branch. Usage: !gitwatch-remove owner/repo:branch")
+    @commands.has_permissions(administrator=True)
+    async def gitwatch_remove_command(self, ctx, spec: str = None):
+        """Stop watching an extra repository branch for this server."""
+        if spec is None:
+            await ctx.send("❌ Usage: `!gitwatch-remove owner/repo:branch`")
+            return
+        repo_path, branch = parse_repo_spec(spec)
+        spec = f"{repo_path}:{branch}"
+        if await self.db.remove_watched_repo(ctx.guild.id, spec):
+            await ctx.send(f"✅ Stopped watching `{spec}`.")
+        else:
+            await ctx.send(f"ℹ️ `{spec}` is not in this server's watch list.")
+    
+    @commands.command(name="gitwatch-list", help="List the repository branches watched for new commits.")
+    async def gitwatch_list_command(self, ctx):
+        """Show the default and server-specific watched branches."""
+        guild_specs = [spec for guild_id, spec in await self.db.get_watched_repos() if guild_id == ctx.guild.id]
+        subscriptions = dict(await self.db.get_git_subscriptions())
+        channel_id = subscriptions.get(ctx.guild.id)
+        
+        embed = discord.Embed(title="👀 Watched Repositories", color=0x24292e)
+        embed.add_field(name="Default", value="\n".join(f"`{spec}`" for spec in self.default_repos), inline=False)
+        embed.add_field(name="This Server", value="\n".join(f"`{spec}`" for spec in guild_specs) or "None", inline=False)
+        embed.add_field(name="Notifications", value=f"<#{channel_id}>" if channel_id else "Off - use `!set-git-channel`", inline=False)
+        await ctx.send(embed=embed)
     
     @commands.command(name="gitcheck", help="Check recent commits on Project Epoch repositories")
     async def gitcheck_command(self, ctx):
         """Check the latest commits for Project Epoch repositories."""
-        
+        started = time.perf_counter()
         repos_to_check = self.default_repos
         
         # Create initial embed
@@ -210,24 +509,8 @@ class GitCheckCog(commands.Cog):
         
         message = await ctx.send(embed=embed)
         
-        # Collect commit information
-        commit_info = []
-        for i, repo in enumerate(repos_to_check):
-            if i > 0:  # Add delay between repositories
-                await asyncio.sleep(0.2)  # 200ms delay between repo checks
-                
-            commit_data = await self.get_latest_commit(repo)
-            if commit_data:
-                # Also get latest branch info (with additional delay)
-                await asyncio.sleep(0.1)
-                branch_info = await self.get_latest_branch(commit_data['repo_path'])
-                commit_data['branch_info'] = branch_info
-                commit_info.append(commit_data)
-            else:
-                commit_info.append({
-                    'repo': repo,
-                    'error': True
-                })
+        # Collect commit information for all repositories at once
+        commit_info = list(await asyncio.gather(*(self.check_repo(repo) for repo in repos_to_check)))
         
         # Update embed with results
         if not commit_info:
@@ -317,13 +600,17 @@ class GitCheckCog(commands.Cog):
             if len([c for c in commit_info if not c.get('error')]) == 2:
                 embed.add_field(name="\u200b", value="\u200b", inline=True)
         
-        # Add footer with check time
+        # Add footer with check time and the remaining GitHub API budget
+        footer = f"Checked at {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}"
+        if self.github.rate_limit_remaining is not None:
+            footer += f" • {self.github.rate_limit_remaining} GitHub API requests left"
         embed.set_footer(
-            text=f"Checked at {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}",
+            text=footer,
             icon_url="https://github.githubassets.com/images/modules/logos_page/GitHub-Mark.png"
         )
         
         await message.edit(embed=embed)
+        self.log_command_latency(time.perf_counter() - started)
 
 async def setup(bot):
     await bot.add_cog(GitCheckCog(bot))
@@ -1,18 +1,13 @@
 import discord
 from discord.ext import commands
-import os
-from db import Database
 
 class NotificationsCog(commands.Cog):
     """Notification opt-in/opt-out functionality and reaction handling."""
     
     def __init__(self, bot):
         self.bot = bot
-        # Get database instance from the main bot
-        self.db = getattr(bot, 'db', None)
-        if not self.db:
-            database_file = os.environ.get("DATABASE_FILE", "bot_settings.db")
-            self.db = Database(database_file)
+        # Shared storage handle injected by the main bot
+        self.db = bot.db
 
     async def add_optin_user(self, guild_id: int, user_id: int):
         # Try to get username from bot if possible
@@ -28,13 +23,13 @@ class NotificationsCog(commands.Cog):
                     member = None
             if member:
                 user_name = member.name
-        self.db.add_optin_user(guild_id, user_id, user_name)
+        await self.db.add_optin_user(guild_id, user_id, user_name)
 
     async def remove_optin_user(self, guild_id: int, user_id: int):
-        self.db.remove_optin_user(guild_id, user_id)
+        await self.db.remove_optin_user(guild_id, user_id)
 
     async def get_optin_users(self, guild_id: int):
-        return self.db.get_optin_users(guild_id)
+        return await self.db.get_optin_users(guild_id)
 
     @commands.command(name="notifyme", help="React to the posted message to opt-in/out of Kezan notifications.")
     async def notifyme_command(self, ctx):
@@ -1,8 +1,7 @@
 import discord
 from discord.ext import commands
-import asyncio
 from datetime import datetime, timezone
-from server_status import check_patch_updates, get_current_patch_info
+from server_status import get_manifest_snapshot, manifest_snapshot, format_file_diff
 
 class PatchCog(commands.Cog):
     """Patch update checking functionality for Project Epoch client."""
@@ -10,10 +9,11 @@ class PatchCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.command(name="patch", help="Checks for new Project Epoch client patches.")
+    @commands.command(name="patch", help="Shows the current Project Epoch client patch.")
     async def patch_command(self, ctx):
         """
-        A command that checks for new client patches and displays update information.
+        Shows the current client version and the most recent detected patch.
+        Read-only: served from the shared manifest snapshot, detection and alerts belong to the background task.
         Usage: !patch
         """
         # Check if bot has basic permissions
@@ -28,48 +28,25 @@ class PatchCog(commands.Cog):
             except discord.Forbidden:
                 return
         
-        try:
-            # Create initial embed
-            embed = discord.Embed(
-                title="🔄 Project Epoch Patch Check",
-                description="Checking for client updates...",
-                color=0xffff00  # Yellow while checking
-            )
-            message = await ctx.send(embed=embed)
-        except discord.Forbidden:
-            try:
-                await ctx.send("❌ Missing permissions to send embeds. Please check bot permissions.")
-            except discord.Forbidden:
-                pass  # Can't even send basic messages
-            return
-        
-        # Check for patch updates
-        has_updates, manifest, updated_files = await check_patch_updates()
+        manifest, age = await get_manifest_snapshot()
         
         if manifest:
             version = manifest.get("Version", "Unknown")
             uid = manifest.get("Uid", "Unknown")
-            checked_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-            total_files = len(manifest.get("Files", []))
+            total_files = manifest.get("FileCount", 0)
+            last_update = manifest_snapshot["last_update"]
             
-            if has_updates:
-                # New patch available
+            if last_update and last_update["uid"] == uid:
+                # This build was detected while the bot was running - show what changed
                 embed = discord.Embed(
-                    title="🆕 New Project Epoch Patch Available!",
+                    title="🆕 Latest Project Epoch Patch",
                     description=f"**Version:** `{version}`\n**Build ID:** `{uid[:12]}...`",
                     color=0x00ff00,  # Green for updates
-                    timestamp=datetime.now(timezone.utc)
+                    timestamp=last_update["detected_at"]
                 )
                 
-                # Show what changed
-                from db import Database
-                import os
-                DATABASE_FILE = os.environ.get("DATABASE_FILE", "bot_settings.db")
-                db = Database(DATABASE_FILE)
-                
-                stored_version_info = db.get_stored_version()
-                if stored_version_info:
-                    stored_version, stored_uid = stored_version_info
+                if last_update["previous"]:
+                    stored_version, stored_uid = last_update["previous"]
                     
                     changes = []
                     if stored_version != version:
@@ -86,34 +63,22 @@ class PatchCog(commands.Cog):
                 
                 embed.add_field(
                     name="📦 Client Files",
-                    value=f"{total_files} files in manifest",
+                    value=f"{total_files} files in manifest\n{format_file_diff(last_update['file_diff'])}",
                     inline=True
                 )
                 
                 embed.add_field(
                     name="⏰ Detected At",
-                    value=f"{checked_at}",
+                    value=last_update["detected_at"].strftime("%Y-%m-%d %H:%M:%S UTC"),
                     inline=True
                 )
                 
                 embed.set_footer(
-                    text="🎮 Download the latest client to get this update!",
+                    text=f"🎮 Download the latest client to get this update! • Checked {int(age)}s ago",
                     icon_url="https://cdn.discordapp.com/emojis/852558866151800832.png"
                 )
                 
-                # Ping opt-in users if this is a notification channel
-                from db import Database
-                db = Database("epoch_bot.db")
-                notification_channel = db.get_notification_channel(ctx.guild.id)
-                
-                if notification_channel == ctx.channel.id:
-                    optin_users = db.get_optin_users(ctx.guild.id)
-                    if optin_users:
-                        user_mentions = " ".join([f"<@{user_id}>" for user_id, _ in optin_users])
-                        await ctx.send(f"🆕 **New Patch Alert!** {user_mentions}")
-                
             else:
-                # No updates available
                 embed = discord.Embed(
                     title="✅ Project Epoch Client Up to Date",
                     description=f"**Current Version:** `{version}`\n**Build ID:** `{uid[:12]}...`",
@@ -129,12 +94,12 @@ class PatchCog(commands.Cog):
                 
                 embed.add_field(
                     name="⏰ Last Check",
-                    value=f"{checked_at}",
+                    value=f"{int(age)}s ago",
                     inline=True
                 )
                 
                 embed.set_footer(
-                    text="No updates available - your client is current!",
+                    text="No new patch detected - your client is current!",
                     icon_url="https://cdn.discordapp.com/emojis/852558866151800832.png"
                 )
                 
@@ -153,23 +118,20 @@ class PatchCog(commands.Cog):
             embed.set_footer(text="Please try again in a moment")
             
         try:
-            await message.edit(embed=embed)
+            await ctx.send(embed=embed)
         except discord.Forbidden:
             try:
-                await ctx.send("❌ Lost permissions while updating patch information. Please check bot permissions.")
+                await ctx.send("❌ Missing permissions to send embeds. Please check bot permissions.")
             except discord.Forbidden:
                 pass  # Can't send any messages
         
         # Log the patch check
         if manifest:
-            version = manifest.get("Version", "Unknown")
-            status_summary = f"Version: {version}, Updates: {'Yes' if has_updates else 'No'}"
-            if has_updates:
-                status_summary += f" ({len(updated_files)} files)"
+            status_summary = f"Version: {manifest.get('Version', 'Unknown')}, snapshot age {int(age)}s"
         else:
             status_summary = "CONNECTION_FAILED"
             
-        print(f"[{discord.utils.utcnow()}] Patch check requested by {ctx.author.name} in guild '{ctx.guild.name}': {status_summary}")
+        print(f"[{discord.utils.utcnow()}] Patch info requested by {ctx.author.name} in guild '{ctx.guild.name}': {status_summary}")
 
 async def setup(bot):
     await bot.add_cog(PatchCog(bot))
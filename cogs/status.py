@@ -1,8 +1,7 @@
 import discord
 from discord.ext import commands
-import asyncio
 from datetime import datetime, timezone
-from server_status import poll_servers
+from server_status import get_status_snapshot
 
 class StatusCog(commands.Cog):
     """Status checking functionality for Project Epoch realm."""
@@ -12,12 +11,12 @@ class StatusCog(commands.Cog):
 
     async def fetch_realm_status_data(self):
         """
-        Checks the realm status via direct server connections and returns status data.
+        Returns (status_data, age_seconds) from the latest poll snapshot, probing only if it is stale.
         """
         try:
-            server_data = await poll_servers()
+            server_data, age = await get_status_snapshot()
             if not server_data:
-                return None
+                return None, 0
             
             # Build status data similar to the old API format
             auth_status = server_data.get("Auth", {}).get("online", False)
@@ -30,10 +29,10 @@ class StatusCog(commands.Cog):
                     {"name": "Kezan", "worldServerOnline": kezan_status},
                     {"name": "Gurubashi", "worldServerOnline": gurubashi_status}
                 ]
-            }
+            }, age
         except Exception as e:
             print(f"[{discord.utils.utcnow()}] Error in fetch_realm_status_data: {e}")
-            return None
+            return None, 0
 
     @commands.command(name="status", help="Checks the current Project Epoch realm status.")
     async def status_command(self, ctx):
@@ -53,22 +52,7 @@ class StatusCog(commands.Cog):
             except discord.Forbidden:
                 return
         
-        try:
-            # Create initial embed
-            embed = discord.Embed(
-                title="🔍 Project Epoch Server Status",
-                description="Checking server status...",
-                color=0xffff00  # Yellow while checking
-            )
-            message = await ctx.send(embed=embed)
-        except discord.Forbidden:
-            try:
-                await ctx.send("❌ Missing permissions to send embeds. Please check bot permissions.")
-            except discord.Forbidden:
-                pass  # Can't even send basic messages
-            return
-        
-        data = await self.fetch_realm_status_data()
+        data, age = await self.fetch_realm_status_data()
         
         if data and isinstance(data, dict):
             auth_status = data.get("authServerStatus", False)
@@ -126,7 +110,7 @@ class StatusCog(commands.Cog):
             
             # Add footer
             embed.set_footer(
-                text="Status checked via direct connection (API backup available)",
+                text=f"Checked {int(age)}s ago via direct connection (API backup available)",
                 icon_url="https://cdn.discordapp.com/emojis/852558866151800832.png"  # Optional: server icon
             )
             
@@ -145,10 +129,10 @@ class StatusCog(commands.Cog):
             embed.set_footer(text="Please try again in a moment")
             
         try:
-            await message.edit(embed=embed)
+            await ctx.send(embed=embed)
         except discord.Forbidden:
             try:
-                await ctx.send("❌ Lost permissions while updating status. Please check bot permissions.")
+                await ctx.send("❌ Missing permissions to send embeds. Please check bot permissions.")
             except discord.Forbidden:
                 pass  # Can't send any messages
         
@@ -157,7 +141,7 @@ class StatusCog(commands.Cog):
             auth_log = "ON" if data.get('authServerStatus') else "OFF"
             kezan_log = "ON" if kezan_online else "OFF"
             gurubashi_log = "ON" if gurubashi_online else "OFF"
-            status_summary = f"Auth: {auth_log}, Kezan: {kezan_log}, Gurubashi: {gurubashi_log}"
+            status_summary = f"Auth: {auth_log}, Kezan: {kezan_log}, Gurubashi: {gurubashi_log} (snapshot age {int(age)}s)"
         else:
             status_summary = "CONNECTION_FAILED"
             
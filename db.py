@@ -1,284 +1,608 @@
+import asyncio
+import functools
 import sqlite3
-from typing import Optional, List, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, List, Tuple, Dict
+
+# Connection tuning: page cache size in KiB and memory-mapped I/O size in bytes
+SQLITE_CACHE_SIZE_KIB = 8192
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024
+
+# A user's balance is snapshotted after this many ledger entries, bounding replay length
+LEDGER_SNAPSHOT_EVERY = 100
+# Ceiling for the jackpot pot and multiplier: nightly doubling would otherwise pass SQLite's 64-bit INTEGER
+JACKPOT_MAX = 10 ** 15
+
+# --- Schema Migrations ---
+# Each migration brings the schema from version N-1 to N and runs once per database file.
+# The applied version is stored in PRAGMA user_version; append new migrations to the end.
+
+def _migrate_baseline(cursor):
+    """Original schema. Tolerates databases created before versioning by older releases."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS guild_settings (
+            guild_id INTEGER PRIMARY KEY,
+            channel_id INTEGER NOT NULL,
+            gambling_channel_id INTEGER
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notification_optins (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            user_name TEXT,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    ''')
+    try:
+        cursor.execute('ALTER TABLE notification_optins ADD COLUMN user_name TEXT')
+    except sqlite3.OperationalError:
+        pass
+    
+    # Add gambling_channel_id column if it doesn't exist
+    try:
+        cursor.execute('ALTER TABLE guild_settings ADD COLUMN gambling_channel_id INTEGER')
+    except sqlite3.OperationalError:
+        pass
+    
+    # Gambling tables
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gambling_balances (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            balance INTEGER NOT NULL DEFAULT 100,
+            last_daily_claim INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gambling_bets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            user_name TEXT,
+            bet_amount INTEGER NOT NULL,
+            predicted_time TEXT NOT NULL,
+            predicted_timestamp INTEGER NOT NULL,
+            placed_at INTEGER NOT NULL,
+            betting_day TEXT NOT NULL,
+            is_active INTEGER DEFAULT 1
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gambling_jackpots (
+            guild_id INTEGER PRIMARY KEY,
+            current_pot INTEGER DEFAULT 0,
+            multiplier INTEGER DEFAULT 1,
+            last_reset_day TEXT NOT NULL
+        )
+    ''')
+    
+    # Patch tracking table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS patch_files (
+            file_path TEXT PRIMARY KEY,
+            file_hash TEXT NOT NULL,
+            last_updated INTEGER NOT NULL
+        )
+    ''')
+    
+    # Patch version tracking table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS patch_version (
+            id INTEGER PRIMARY KEY,
+            version TEXT NOT NULL,
+            uid TEXT NOT NULL,
+            last_updated INTEGER NOT NULL
+        )
+    ''')
+    
+    # Add new columns to existing tables if they don't exist
+    try:
+        cursor.execute('ALTER TABLE gambling_balances ADD COLUMN last_daily_claim INTEGER DEFAULT 0')
+    except sqlite3.OperationalError:
+        pass
+    
+    try:
+        cursor.execute('ALTER TABLE gambling_bets ADD COLUMN betting_day TEXT NOT NULL DEFAULT ""')
+    except sqlite3.OperationalError:
+        pass
+
+def _migrate_realm_state(cursor):
+    """Persisted realm and per-guild notification state."""
+    # Realm state tracking tables (survive restarts so the first poll is already accurate)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS realm_state (
+            server_name TEXT PRIMARY KEY,
+            online INTEGER NOT NULL,
+            last_online INTEGER,
+            last_change TEXT
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS guild_realm_state (
+            guild_id INTEGER PRIMARY KEY,
+            auth INTEGER NOT NULL,
+            kezan INTEGER NOT NULL,
+            gurubashi INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL
+        )
+    ''')
+
+def _migrate_git_watch(cursor):
+    """Commit watcher: last seen head per branch, per-guild notification channel and extra repos."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS git_watch_state (
+            repo TEXT NOT NULL,
+            branch TEXT NOT NULL,
+            last_sha TEXT NOT NULL,
+            updated_at INTEGER NOT NULL,
+            PRIMARY KEY (repo, branch)
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS git_subscriptions (
+            guild_id INTEGER PRIMARY KEY,
+            channel_id INTEGER NOT NULL
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS git_watch_repos (
+            guild_id INTEGER NOT NULL,
+            repo_spec TEXT NOT NULL,
+            PRIMARY KEY (guild_id, repo_spec)
+        )
+    ''')
+
+def _migrate_ledger(cursor):
+    """Append-only balance ledger with per-user snapshots, opened with every existing balance."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gambling_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            delta INTEGER NOT NULL,
+            entry_type TEXT NOT NULL,
+            counterparty_id INTEGER,
+            message_id INTEGER,
+            created_at INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ledger_user ON gambling_ledger (guild_id, user_id, id)')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gambling_balance_snapshots (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            balance INTEGER NOT NULL,
+            ledger_id INTEGER NOT NULL,
+            created_at INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    ''')
+    
+    # Ledger entries written since the user's last snapshot
+    cursor.execute('ALTER TABLE gambling_balances ADD COLUMN ledger_pending INTEGER NOT NULL DEFAULT 0')
+    
+    cursor.execute('''
+        INSERT INTO gambling_ledger (guild_id, user_id, delta, entry_type, created_at)
+        SELECT guild_id, user_id, balance, 'opening', strftime('%s', 'now') FROM gambling_balances
+    ''')
+    cursor.execute('UPDATE gambling_balances SET ledger_pending = 1')
+
+def _migrate_bet_indexes(cursor):
+    """Indexes for the per-day bet queries (closest-bet search, listings) and per-user bet checks."""
+    # Partial on is_active: settled bets drop out of the index, so it only ever holds live bets
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_bets_day
+        ON gambling_bets (guild_id, betting_day, predicted_timestamp) WHERE is_active = 1
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_bets_user ON gambling_bets (guild_id, user_id)')
+
+def _migrate_betting_closed(cursor):
+    """Betting days closed by a verified launch; kept across restarts until settled or called a false alarm."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gambling_closed_days (
+            guild_id INTEGER PRIMARY KEY,
+            betting_day TEXT NOT NULL
+        )
+    ''')
+
+MIGRATIONS = [
+    _migrate_baseline,
+    _migrate_realm_state,
+    _migrate_git_watch,
+    _migrate_ledger,
+    _migrate_bet_indexes,
+    _migrate_betting_closed,
+]
 
 class Database:
     def __init__(self, db_file: str):
         self.db_file = db_file
+        # One long-lived connection shared by the event loop and worker threads.
+        # The lock serializes access to it; sqlite3 caches prepared statements per connection.
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False, cached_statements=256)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}")
+        self._conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        # Read-through caches for the polling hot path. Every write to guild_settings or
+        # notification_optins goes through this class and invalidates the affected guild.
+        self._guild_settings_cache: Dict[int, Optional[Tuple[int, Optional[int]]]] = {}
+        self._optin_cache: Dict[int, List[Tuple[int, Optional[str]]]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
         self._init_db()
 
+    @contextmanager
+    def _cursor(self, immediate: bool = False):
+        """
+        Yield a cursor on the shared connection. Commits on success, rolls back on error.
+        immediate=True takes SQLite's write lock up front (BEGIN IMMEDIATE) for read-check-write transactions.
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                if immediate:
+                    cursor.execute("BEGIN IMMEDIATE")
+                yield cursor
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def close(self):
+        """Close the shared connection."""
+        with self._lock:
+            self._conn.close()
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and sizes of the guild settings and opt-in caches."""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "guild_settings": len(self._guild_settings_cache),
+            "optins": len(self._optin_cache)
+        }
+
+    def _get_guild_settings(self, guild_id: int) -> Optional[Tuple[int, Optional[int]]]:
+        """Get (channel_id, gambling_channel_id) for a guild, or None if it has no settings row."""
+        if guild_id in self._guild_settings_cache:
+            self.cache_hits += 1
+            return self._guild_settings_cache[guild_id]
+        self.cache_misses += 1
+        with self._cursor() as cursor:
+            cursor.execute("SELECT channel_id, gambling_channel_id FROM guild_settings WHERE guild_id = ?", (guild_id,))
+            result = cursor.fetchone()
+        self._guild_settings_cache[guild_id] = result
+        return result
+
     def _init_db(self):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS guild_settings (
-                guild_id INTEGER PRIMARY KEY,
-                channel_id INTEGER NOT NULL,
-                gambling_channel_id INTEGER
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notification_optins (
-                guild_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                user_name TEXT,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        ''')
-        try:
-            cursor.execute('ALTER TABLE notification_optins ADD COLUMN user_name TEXT')
-        except sqlite3.OperationalError:
-            pass
-        
-        # Add gambling_channel_id column if it doesn't exist
-        try:
-            cursor.execute('ALTER TABLE guild_settings ADD COLUMN gambling_channel_id INTEGER')
-        except sqlite3.OperationalError:
-            pass
-        
-        # Gambling tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS gambling_balances (
-                guild_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                balance INTEGER NOT NULL DEFAULT 100,
-                last_daily_claim INTEGER DEFAULT 0,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS gambling_bets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                user_name TEXT,
-                bet_amount INTEGER NOT NULL,
-                predicted_time TEXT NOT NULL,
-                predicted_timestamp INTEGER NOT NULL,
-                placed_at INTEGER NOT NULL,
-                betting_day TEXT NOT NULL,
-                is_active INTEGER DEFAULT 1
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS gambling_jackpots (
-                guild_id INTEGER PRIMARY KEY,
-                current_pot INTEGER DEFAULT 0,
-                multiplier INTEGER DEFAULT 1,
-                last_reset_day TEXT NOT NULL
-            )
-        ''')
-        
-        # Patch tracking table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS patch_files (
-                file_path TEXT PRIMARY KEY,
-                file_hash TEXT NOT NULL,
-                last_updated INTEGER NOT NULL
-            )
-        ''')
-        
-        # Patch version tracking table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS patch_version (
-                id INTEGER PRIMARY KEY,
-                version TEXT NOT NULL,
-                uid TEXT NOT NULL,
-                last_updated INTEGER NOT NULL
-            )
-        ''')
-        
-        # Add new columns to existing tables if they don't exist
-        try:
-            cursor.execute('ALTER TABLE gambling_balances ADD COLUMN last_daily_claim INTEGER DEFAULT 0')
-        except sqlite3.OperationalError:
-            pass
-        
-        try:
-            cursor.execute('ALTER TABLE gambling_bets ADD COLUMN betting_day TEXT NOT NULL DEFAULT ""')
-        except sqlite3.OperationalError:
-            pass
-        
-        conn.commit()
-        conn.close()
+        """Apply pending schema migrations. A no-op once the schema is current."""
+        while True:
+            # One explicit transaction per migration: sqlite3 would otherwise autocommit the
+            # DDL statements, so a failure halfway could leave an ALTER applied without its
+            # user_version bump and the next start would fail re-running it.
+            with self._cursor(immediate=True) as cursor:
+                cursor.execute("PRAGMA user_version")
+                version = cursor.fetchone()[0]
+                if version >= len(MIGRATIONS):
+                    return
+                migration = MIGRATIONS[version]
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {version + 1}")
+            print(f"Applied database migration {version + 1}: {migration.__name__}")
 
     def set_notification_channel(self, guild_id: int, channel_id: int):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT OR REPLACE INTO guild_settings (guild_id, channel_id) VALUES (?, ?)",
-            (guild_id, channel_id)
-        )
-        conn.commit()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO guild_settings (guild_id, channel_id) VALUES (?, ?)",
+                (guild_id, channel_id)
+            )
+        self._guild_settings_cache.pop(guild_id, None)
 
     def get_notification_channel(self, guild_id: int) -> Optional[int]:
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute("SELECT channel_id FROM guild_settings WHERE guild_id = ?", (guild_id,))
-        result = cursor.fetchone()
-        conn.close()
+        result = self._get_guild_settings(guild_id)
         if result:
             return result[0]
         return None
 
     def add_optin_user(self, guild_id: int, user_id: int, user_name: Optional[str] = None):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT OR REPLACE INTO notification_optins (guild_id, user_id, user_name) VALUES (?, ?, ?)",
-            (guild_id, user_id, user_name)
-        )
-        conn.commit()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO notification_optins (guild_id, user_id, user_name) VALUES (?, ?, ?)",
+                (guild_id, user_id, user_name)
+            )
+        self._optin_cache.pop(guild_id, None)
 
     def remove_optin_user(self, guild_id: int, user_id: int):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute(
-            "DELETE FROM notification_optins WHERE guild_id = ? AND user_id = ?",
-            (guild_id, user_id)
-        )
-        conn.commit()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM notification_optins WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
+            )
+        self._optin_cache.pop(guild_id, None)
 
     def get_optin_users(self, guild_id: int) -> List[Tuple[int, Optional[str]]]:
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT user_id, user_name FROM notification_optins WHERE guild_id = ?",
-            (guild_id,)
-        )
-        users = [(row[0], row[1]) for row in cursor.fetchall()]
-        conn.close()
-        return users
+        if guild_id in self._optin_cache:
+            self.cache_hits += 1
+            return list(self._optin_cache[guild_id])
+        self.cache_misses += 1
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT user_id, user_name FROM notification_optins WHERE guild_id = ?",
+                (guild_id,)
+            )
+            users = [(row[0], row[1]) for row in cursor.fetchall()]
+        self._optin_cache[guild_id] = users
+        return list(users)
 
     # --- Gambling System Methods ---
     
     def get_gambling_balance(self, guild_id: int, user_id: int, starting_balance: int = 100) -> int:
         """Get user's current epoch balance."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT balance FROM gambling_balances WHERE guild_id = ? AND user_id = ?",
-            (guild_id, user_id)
-        )
-        result = cursor.fetchone()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT balance FROM gambling_balances WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
+            )
+            result = cursor.fetchone()
         
         if result:
             return result[0]
         else:
             # First time user, give them starting balance
-            self.set_gambling_balance(guild_id, user_id, starting_balance)
+            with self._cursor() as cursor:
+                self._ensure_balance(cursor, guild_id, user_id, starting_balance)
             return starting_balance
 
-    def set_gambling_balance(self, guild_id: int, user_id: int, balance: int):
-        """Set user's epoch balance."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+    def set_gambling_balance(self, guild_id: int, user_id: int, balance: int, starting_balance: int = 100):
+        """Set user's epoch balance, recorded in the ledger as the difference. Prefer transfer_balance or place_bet for moves."""
+        with self._cursor() as cursor:
+            self._ensure_balance(cursor, guild_id, user_id, starting_balance)
+            cursor.execute(
+                "SELECT balance FROM gambling_balances WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
+            )
+            delta = balance - cursor.fetchone()[0]
+            cursor.execute(
+                "UPDATE gambling_balances SET balance = ? WHERE guild_id = ? AND user_id = ?",
+                (balance, guild_id, user_id)
+            )
+            self._record(cursor, guild_id, user_id, delta, "set")
+
+    # --- Ledger ---
+    # Every balance change is appended to gambling_ledger in the same transaction as the change.
+    # gambling_balances holds the materialized balance (O(1) reads); gambling_balance_snapshots
+    # stores (balance, ledger_id) every LEDGER_SNAPSHOT_EVERY entries so rebuild_balance() only
+    # replays the entries after the last snapshot.
+
+    def _record(self, cursor, guild_id: int, user_id: int, delta: int, entry_type: str,
+                counterparty_id: Optional[int] = None, message_id: Optional[int] = None):
+        """Append a ledger entry for a balance change just applied in this transaction."""
+        import time
+        now = int(time.time())
+        cursor.execute('''
+            INSERT INTO gambling_ledger (guild_id, user_id, delta, entry_type, counterparty_id, message_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (guild_id, user_id, delta, entry_type, counterparty_id, message_id, now))
+        ledger_id = cursor.lastrowid
         cursor.execute(
-            "INSERT OR REPLACE INTO gambling_balances (guild_id, user_id, balance) VALUES (?, ?, ?)",
-            (guild_id, user_id, balance)
+            "UPDATE gambling_balances SET ledger_pending = ledger_pending + 1 WHERE guild_id = ? AND user_id = ?",
+            (guild_id, user_id)
         )
-        conn.commit()
-        conn.close()
+        cursor.execute(
+            "SELECT balance, ledger_pending FROM gambling_balances WHERE guild_id = ? AND user_id = ?",
+            (guild_id, user_id)
+        )
+        balance, pending = cursor.fetchone()
+        if pending >= LEDGER_SNAPSHOT_EVERY:
+            cursor.execute(
+                "INSERT OR REPLACE INTO gambling_balance_snapshots (guild_id, user_id, balance, ledger_id, created_at) VALUES (?, ?, ?, ?, ?)",
+                (guild_id, user_id, balance, ledger_id, now)
+            )
+            cursor.execute(
+                "UPDATE gambling_balances SET ledger_pending = 0 WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
+            )
+
+    def _ensure_balance(self, cursor, guild_id: int, user_id: int, starting_balance: int):
+        """Create a user's balance row with the starting balance (and its ledger entry) if it doesn't exist."""
+        cursor.execute(
+            "INSERT OR IGNORE INTO gambling_balances (guild_id, user_id, balance) VALUES (?, ?, ?)",
+            (guild_id, user_id, starting_balance)
+        )
+        if cursor.rowcount > 0:
+            self._record(cursor, guild_id, user_id, starting_balance, "starting")
+
+    def rebuild_balance(self, guild_id: int, user_id: int) -> int:
+        """Recompute a balance from the ledger: the last snapshot plus every entry after it."""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT balance, ledger_id FROM gambling_balance_snapshots WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
+            )
+            snapshot = cursor.fetchone() or (0, 0)
+            cursor.execute(
+                "SELECT COALESCE(SUM(delta), 0) FROM gambling_ledger WHERE guild_id = ? AND user_id = ? AND id > ?",
+                (guild_id, user_id, snapshot[1])
+            )
+            return snapshot[0] + cursor.fetchone()[0]
+
+    # --- Balance Mutations ---
+    # Changes are SQL-side deltas inside one BEGIN IMMEDIATE transaction: SQLite's write lock
+    # serializes writers on every connection, and the debit is guarded by "balance >= ?" in the
+    # UPDATE itself, so there is no read-then-write window to lose an update in.
+
+    def transfer_balance(self, guild_id: int, from_user_id: int, to_user_id: int, amount: int, starting_balance: int = 100,
+                         entry_type: str = "transfer", message_id: Optional[int] = None) -> Tuple[bool, int, int]:
+        """
+        Move amount between two users in one transaction; each side's ledger entry names the other as counterparty.
+        Returns (success, from_balance, to_balance); fails without changes if the sender can't cover it.
+        """
+        with self._cursor(immediate=True) as cursor:
+            self._ensure_balance(cursor, guild_id, from_user_id, starting_balance)
+            self._ensure_balance(cursor, guild_id, to_user_id, starting_balance)
+            moved = False
+            if from_user_id != to_user_id:
+                cursor.execute(
+                    "UPDATE gambling_balances SET balance = balance - ? WHERE guild_id = ? AND user_id = ? AND balance >= ?",
+                    (amount, guild_id, from_user_id, amount)
+                )
+                moved = cursor.rowcount > 0
+            if moved:
+                cursor.execute(
+                    "UPDATE gambling_balances SET balance = balance + ? WHERE guild_id = ? AND user_id = ?",
+                    (amount, guild_id, to_user_id)
+                )
+                self._record(cursor, guild_id, from_user_id, -amount, entry_type, to_user_id, message_id)
+                self._record(cursor, guild_id, to_user_id, amount, entry_type, from_user_id, message_id)
+            cursor.execute(
+                "SELECT user_id, balance FROM gambling_balances WHERE guild_id = ? AND user_id IN (?, ?)",
+                (guild_id, from_user_id, to_user_id)
+            )
+            balances = dict(cursor.fetchall())
+            return moved, balances[from_user_id], balances[to_user_id]
 
     def add_gambling_bet(self, guild_id: int, user_id: int, user_name: str, bet_amount: int, 
                         predicted_time: str, predicted_timestamp: int, placed_at: int, betting_day: str) -> bool:
         """Add a new bet to the database."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
         try:
+            with self._cursor() as cursor:
+                cursor.execute('''
+                    INSERT INTO gambling_bets 
+                    (guild_id, user_id, user_name, bet_amount, predicted_time, predicted_timestamp, placed_at, betting_day)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (guild_id, user_id, user_name, bet_amount, predicted_time, predicted_timestamp, placed_at, betting_day))
+            return True
+        except Exception as e:
+            print(f"Error adding bet: {e}")
+            return False
+
+    def place_bet(self, guild_id: int, user_id: int, user_name: str, bet_amount: int, predicted_time: str,
+                  predicted_timestamp: int, placed_at: int, betting_day: str, starting_balance: int = 100,
+                  message_id: Optional[int] = None) -> Tuple[bool, int, bool]:
+        """
+        Debit the stake, add it to the jackpot and record the bet in one transaction.
+        Returns (success, balance, is_first_bet); on insufficient funds nothing changes and balance is the current one.
+        """
+        with self._cursor(immediate=True) as cursor:
+            self._ensure_balance(cursor, guild_id, user_id, starting_balance)
+            cursor.execute(
+                "UPDATE gambling_balances SET balance = balance - ? WHERE guild_id = ? AND user_id = ? AND balance >= ?",
+                (bet_amount, guild_id, user_id, bet_amount)
+            )
+            debited = cursor.rowcount > 0
+            if debited:
+                self._record(cursor, guild_id, user_id, -bet_amount, "bet", message_id=message_id)
+            cursor.execute(
+                "SELECT balance FROM gambling_balances WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
+            )
+            balance = cursor.fetchone()[0]
+            if not debited:
+                return False, balance, False
+            
+            cursor.execute(
+                "SELECT 1 FROM gambling_bets WHERE guild_id = ? AND user_id = ? LIMIT 1",
+                (guild_id, user_id)
+            )
+            is_first_bet = cursor.fetchone() is None
+            
+            cursor.execute('''
+                INSERT INTO gambling_jackpots (guild_id, current_pot, multiplier, last_reset_day)
+                VALUES (?, ?, 1, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET current_pot = current_pot + excluded.current_pot
+            ''', (guild_id, bet_amount, betting_day))
+            
             cursor.execute('''
                 INSERT INTO gambling_bets 
                 (guild_id, user_id, user_name, bet_amount, predicted_time, predicted_timestamp, placed_at, betting_day)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (guild_id, user_id, user_name, bet_amount, predicted_time, predicted_timestamp, placed_at, betting_day))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error adding bet: {e}")
-            return False
-        finally:
-            conn.close()
+        return True, balance, is_first_bet
 
     def get_active_gambling_bets(self, guild_id: int) -> List[Tuple]:
         """Get all active bets for a guild."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT user_name, bet_amount, predicted_time, predicted_timestamp
-            FROM gambling_bets 
-            WHERE guild_id = ? AND is_active = 1
-            ORDER BY predicted_timestamp ASC
-        ''', (guild_id,))
-        results = cursor.fetchall()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute('''
+                SELECT user_name, bet_amount, predicted_time, predicted_timestamp
+                FROM gambling_bets 
+                WHERE guild_id = ? AND is_active = 1
+                ORDER BY predicted_timestamp ASC
+            ''', (guild_id,))
+            results = cursor.fetchall()
         return results
 
-    def claim_daily_epochs(self, guild_id: int, user_id: int, current_day: str, daily_amount: int = 50) -> Tuple[bool, str]:
+    def claim_daily_epochs(self, guild_id: int, user_id: int, current_day: str, daily_amount: int = 50,
+                           message_id: Optional[int] = None) -> Tuple[bool, str]:
         """Claim daily epochs if user hasn't claimed today and has placed at least one bet.
         Returns (success, reason)"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
         try:
-            # Check if user has ever placed a bet
-            cursor.execute('''
-                SELECT COUNT(*) FROM gambling_bets 
-                WHERE guild_id = ? AND user_id = ?
-            ''', (guild_id, user_id))
-            bet_count = cursor.fetchone()[0]
-            
-            if bet_count == 0:
-                return False, "no_bets"
+            with self._cursor() as cursor:
+                # Check if user has ever placed a bet
+                cursor.execute('''
+                    SELECT COUNT(*) FROM gambling_bets 
+                    WHERE guild_id = ? AND user_id = ?
+                ''', (guild_id, user_id))
+                bet_count = cursor.fetchone()[0]
             
-            # Get current balance and last claim day
-            cursor.execute('''
-                SELECT balance, last_daily_claim FROM gambling_balances 
-                WHERE guild_id = ? AND user_id = ?
-            ''', (guild_id, user_id))
-            result = cursor.fetchone()
+                if bet_count == 0:
+                    return False, "no_bets"
             
-            if result:
-                current_balance, last_claim = result
-                if last_claim == current_day:
-                    return False, "already_claimed"
-                
-                # Update balance and claim day
+                # Get current balance and last claim day
                 cursor.execute('''
-                    UPDATE gambling_balances 
-                    SET balance = balance + ?, last_daily_claim = ?
+                    SELECT balance, last_daily_claim FROM gambling_balances 
                     WHERE guild_id = ? AND user_id = ?
-                ''', (daily_amount, current_day, guild_id, user_id))
-            else:
-                # First time user, create record with daily claim
-                cursor.execute('''
-                    INSERT INTO gambling_balances (guild_id, user_id, balance, last_daily_claim)
-                    VALUES (?, ?, ?, ?)
-                ''', (guild_id, user_id, 100 + daily_amount, current_day))
+                ''', (guild_id, user_id))
+                result = cursor.fetchone()
+            
+                if result:
+                    current_balance, last_claim = result
+                    if last_claim == current_day:
+                        return False, "already_claimed"
+                
+                    # Update balance and claim day
+                    cursor.execute('''
+                        UPDATE gambling_balances 
+                        SET balance = balance + ?, last_daily_claim = ?
+                        WHERE guild_id = ? AND user_id = ?
+                    ''', (daily_amount, current_day, guild_id, user_id))
+                else:
+                    # First time user, create record with daily claim
+                    self._ensure_balance(cursor, guild_id, user_id, 100)
+                    cursor.execute('''
+                        UPDATE gambling_balances
+                        SET balance = balance + ?, last_daily_claim = ?
+                        WHERE guild_id = ? AND user_id = ?
+                    ''', (daily_amount, current_day, guild_id, user_id))
+                self._record(cursor, guild_id, user_id, daily_amount, "daily", message_id=message_id)
             
-            conn.commit()
             return True, "success"
         except Exception as e:
             print(f"Error claiming daily epochs: {e}")
             return False, "error"
-        finally:
-            conn.close()
 
     def has_claimed_daily(self, guild_id: int, user_id: int, current_day: str) -> bool:
         """Check if user has already claimed daily epochs today."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT last_daily_claim FROM gambling_balances 
-            WHERE guild_id = ? AND user_id = ?
-        ''', (guild_id, user_id))
-        result = cursor.fetchone()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute('''
+                SELECT last_daily_claim FROM gambling_balances 
+                WHERE guild_id = ? AND user_id = ?
+            ''', (guild_id, user_id))
+            result = cursor.fetchone()
         
         if result and result[0] == current_day:
             return True
@@ -286,26 +610,22 @@ class Database:
 
     def has_placed_any_bet(self, guild_id: int, user_id: int) -> bool:
         """Check if user has ever placed a bet."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT COUNT(*) FROM gambling_bets 
-            WHERE guild_id = ? AND user_id = ?
-        ''', (guild_id, user_id))
-        count = cursor.fetchone()[0]
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute('''
+                SELECT COUNT(*) FROM gambling_bets 
+                WHERE guild_id = ? AND user_id = ?
+            ''', (guild_id, user_id))
+            count = cursor.fetchone()[0]
         return count > 0
 
     def get_current_jackpot(self, guild_id: int) -> Tuple[int, int]:
         """Get current jackpot amount and multiplier."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT current_pot, multiplier FROM gambling_jackpots 
-            WHERE guild_id = ?
-        ''', (guild_id,))
-        result = cursor.fetchone()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute('''
+                SELECT current_pot, multiplier FROM gambling_jackpots 
+                WHERE guild_id = ?
+            ''', (guild_id,))
+            result = cursor.fetchone()
         
         if result:
             return result[0], result[1]
@@ -313,111 +633,236 @@ class Database:
 
     def update_jackpot(self, guild_id: int, additional_pot: int, current_day: str):
         """Add to the current jackpot."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        with self._cursor() as cursor:
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO gambling_jackpots (guild_id, current_pot, multiplier, last_reset_day)
-            VALUES (?, 
-                    COALESCE((SELECT current_pot FROM gambling_jackpots WHERE guild_id = ?), 0) + ?,
-                    COALESCE((SELECT multiplier FROM gambling_jackpots WHERE guild_id = ?), 1),
-                    ?)
-        ''', (guild_id, guild_id, additional_pot, guild_id, current_day))
-        conn.commit()
-        conn.close()
-
-    def rollover_jackpot(self, guild_id: int, current_day: str):
-        """Double the jackpot for rollover to next day."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE gambling_jackpots 
-            SET current_pot = current_pot * 2, multiplier = multiplier * 2, last_reset_day = ?
-            WHERE guild_id = ?
-        ''', (current_day, guild_id))
-        
-        # If no jackpot exists, create one
-        if cursor.rowcount == 0:
             cursor.execute('''
-                INSERT INTO gambling_jackpots (guild_id, current_pot, multiplier, last_reset_day)
-                VALUES (?, 0, 2, ?)
-            ''', (guild_id, current_day))
-        
-        conn.commit()
-        conn.close()
+                INSERT OR REPLACE INTO gambling_jackpots (guild_id, current_pot, multiplier, last_reset_day)
+                VALUES (?, 
+                        COALESCE((SELECT current_pot FROM gambling_jackpots WHERE guild_id = ?), 0) + ?,
+                        COALESCE((SELECT multiplier FROM gambling_jackpots WHERE guild_id = ?), 1),
+                        ?)
+            ''', (guild_id, guild_id, additional_pot, guild_id, current_day))
 
-    def reset_daily_bets(self, guild_id: int, current_day: str):
-        """Mark all bets from previous days as inactive."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE gambling_bets 
-            SET is_active = 0 
-            WHERE guild_id = ? AND betting_day != ? AND is_active = 1
-        ''', (guild_id, current_day))
-        conn.commit()
-        conn.close()
+    def rollover_jackpots(self, current_day: str) -> List[Tuple[int, int, int, int, int, int]]:
+        """
+        Roll every gambling guild's jackpot over to current_day in one transaction: the pot and multiplier double
+        once per midnight since last_reset_day (so rollovers missed while offline are caught up), and bets from
+        earlier days are deactivated. Empty jackpots only move last_reset_day forward, so the next bet
+        (which leaves last_reset_day alone) doesn't count the days the pot sat empty as missed rollovers.
+        Returns (guild_id, channel_id, old_amount, old_multiplier, new_amount, new_multiplier) per rolled-over guild.
+        """
+        from datetime import date
+        
+        with self._cursor(immediate=True) as cursor:
+            cursor.execute('''
+                SELECT j.guild_id, s.gambling_channel_id, j.current_pot, j.multiplier, j.last_reset_day
+                FROM gambling_jackpots j JOIN guild_settings s ON s.guild_id = j.guild_id
+                WHERE s.gambling_channel_id IS NOT NULL AND j.current_pot > 0 AND j.last_reset_day < ?
+            ''', (current_day,))
+            
+            rolled = []
+            for guild_id, channel_id, old_amount, old_multiplier, last_reset_day in cursor.fetchall():
+                # One guild's bad row must not block everyone else's rollover
+                try:
+                    try:
+                        missed = (date.fromisoformat(current_day) - date.fromisoformat(last_reset_day)).days
+                    except ValueError:
+                        missed = 1
+                    # 64 doublings already reach JACKPOT_MAX from any pot; no need to build bigger numbers
+                    factor = 2 ** min(max(missed, 1), 64)
+                    new_amount = min(old_amount * factor, JACKPOT_MAX)
+                    new_multiplier = min(old_multiplier * factor, JACKPOT_MAX)
+                    cursor.execute(
+                        "UPDATE gambling_jackpots SET current_pot = ?, multiplier = ?, last_reset_day = ? WHERE guild_id = ?",
+                        (new_amount, new_multiplier, current_day, guild_id)
+                    )
+                except Exception as e:
+                    print(f"Error rolling over jackpot for guild {guild_id}: {e}")
+                    continue
+                rolled.append((guild_id, channel_id, old_amount, old_multiplier, new_amount, new_multiplier))
+            
+            cursor.execute(
+                "UPDATE gambling_jackpots SET last_reset_day = ? WHERE current_pot = 0 AND last_reset_day < ?",
+                (current_day, current_day)
+            )
+            
+            # Mark all bets from previous days as inactive
+            cursor.execute(
+                "UPDATE gambling_bets SET is_active = 0 WHERE betting_day < ? AND is_active = 1",
+                (current_day,)
+            )
+            # Launches that were never confirmed or dismissed don't keep betting closed past their day
+            cursor.execute("DELETE FROM gambling_closed_days WHERE betting_day < ?", (current_day,))
+        return rolled
 
     def get_active_gambling_bets_for_day(self, guild_id: int, betting_day: str) -> List[Tuple]:
         """Get all active bets for a specific day."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT user_name, bet_amount, predicted_time, predicted_timestamp
-            FROM gambling_bets 
-            WHERE guild_id = ? AND betting_day = ? AND is_active = 1
-            ORDER BY predicted_timestamp ASC
-        ''', (guild_id, betting_day))
-        results = cursor.fetchall()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute('''
+                SELECT user_name, bet_amount, predicted_time, predicted_timestamp
+                FROM gambling_bets 
+                WHERE guild_id = ? AND betting_day = ? AND is_active = 1
+                ORDER BY predicted_timestamp ASC
+            ''', (guild_id, betting_day))
+            results = cursor.fetchall()
         return results
 
-    def set_gambling_channel(self, guild_id: int, channel_id: int):
-        """Set the gambling channel for a guild."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+    @staticmethod
+    def _closest_bets(cursor, guild_id: int, betting_day: str, launch_timestamp: int) -> Tuple[Optional[int], List[Tuple]]:
+        # Nearest neighbour on each side of the launch, each a single seek on idx_bets_day.
+        # Bets placed after the launch never count, so a launch announcement can't be bet on.
+        differences = []
+        for comparison, order in (("<=", "DESC"), (">=", "ASC")):
+            cursor.execute(f'''
+                SELECT predicted_timestamp FROM gambling_bets
+                WHERE guild_id = ? AND betting_day = ? AND is_active = 1 AND predicted_timestamp {comparison} ?
+                AND placed_at <= ?
+                ORDER BY predicted_timestamp {order} LIMIT 1
+            ''', (guild_id, betting_day, launch_timestamp, launch_timestamp))
+            result = cursor.fetchone()
+            if result:
+                differences.append(abs(result[0] - launch_timestamp))
+        if not differences:
+            return None, []
         
-        # Check if guild settings exist
-        cursor.execute("SELECT gambling_channel_id FROM guild_settings WHERE guild_id = ?", (guild_id,))
-        result = cursor.fetchone()
+        # Every bet at exactly that distance shares the win
+        min_difference = min(differences)
+        cursor.execute('''
+            SELECT user_id, user_name, bet_amount, predicted_timestamp FROM gambling_bets
+            WHERE guild_id = ? AND betting_day = ? AND is_active = 1 AND predicted_timestamp IN (?, ?)
+            AND placed_at <= ?
+            ORDER BY id
+        ''', (guild_id, betting_day, launch_timestamp - min_difference, launch_timestamp + min_difference, launch_timestamp))
+        return min_difference, cursor.fetchall()
+
+    def find_closest_bets(self, guild_id: int, betting_day: str, launch_timestamp: int) -> Tuple[Optional[int], List[Tuple]]:
+        """
+        Find the active bets placed by launch_timestamp and predicted closest to it.
+        Returns (difference in seconds, [(user_id, user_name, bet_amount, predicted_timestamp)]), or (None, []) without bets.
+        """
+        with self._cursor() as cursor:
+            return self._closest_bets(cursor, guild_id, betting_day, launch_timestamp)
+
+    def find_launch_winners(self, betting_day: str, launch_timestamp: int) -> List[Tuple[int, int, int, int, List[Tuple]]]:
+        """
+        Find the closest bets in every gambling guild with a jackpot, in one read transaction.
+        Returns (guild_id, channel_id, jackpot_amount, min_difference, winners) per guild with active bets that day.
+        """
+        with self._cursor() as cursor:
+            cursor.execute('''
+                SELECT s.guild_id, s.gambling_channel_id, j.current_pot
+                FROM guild_settings s JOIN gambling_jackpots j ON j.guild_id = s.guild_id
+                WHERE s.gambling_channel_id IS NOT NULL AND j.current_pot > 0
+            ''')
+            guilds = cursor.fetchall()
+            
+            results = []
+            for guild_id, channel_id, jackpot_amount in guilds:
+                min_difference, winners = self._closest_bets(cursor, guild_id, betting_day, launch_timestamp)
+                if winners:
+                    results.append((guild_id, channel_id, jackpot_amount, min_difference, winners))
+        return results
+
+    def close_betting_day(self, guild_ids: List[int], betting_day: str):
+        """Stop accepting bets for betting_day in these guilds once a launch is verified."""
+        with self._cursor() as cursor:
+            cursor.executemany(
+                "INSERT OR REPLACE INTO gambling_closed_days (guild_id, betting_day) VALUES (?, ?)",
+                [(guild_id, betting_day) for guild_id in guild_ids]
+            )
+
+    def reopen_betting(self, guild_id: int):
+        """Accept bets again after a detected launch was called a false alarm."""
+        with self._cursor() as cursor:
+            cursor.execute("DELETE FROM gambling_closed_days WHERE guild_id = ?", (guild_id,))
+
+    def is_betting_closed(self, guild_id: int, betting_day: str) -> bool:
+        """Check if betting_day was closed by a verified launch that hasn't been settled or dismissed."""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM gambling_closed_days WHERE guild_id = ? AND betting_day = ?",
+                (guild_id, betting_day)
+            )
+            return cursor.fetchone() is not None
+
+    def settle_betting_day(self, guild_id: int, betting_day: str, winner_ids: List[int], payout_per_winner: int) -> bool:
+        """
+        Pay payout_per_winner for every winning bet (winner_ids holds one user_id per bet), then reset the
+        jackpot and deactivate the day's bets, all in one transaction.
+        Returns False without paying anything if the day has no active bets left (already settled).
+        """
+        payouts: Dict[int, int] = {}
+        for user_id in winner_ids:
+            payouts[user_id] = payouts.get(user_id, 0) + payout_per_winner
         
-        if result is not None:
-            # Update existing record
+        with self._cursor(immediate=True) as cursor:
+            # Settling (or finding the day already settled) ends the launch's betting close
             cursor.execute(
-                "UPDATE guild_settings SET gambling_channel_id = ? WHERE guild_id = ?",
-                (channel_id, guild_id)
+                "DELETE FROM gambling_closed_days WHERE guild_id = ? AND betting_day = ?",
+                (guild_id, betting_day)
             )
-        else:
-            # Insert new record (we need a notification channel_id, so we'll use the gambling channel as default)
+            
+            # Deactivate all bets for this day; doing it first makes a second settlement a no-op
+            cursor.execute(
+                "UPDATE gambling_bets SET is_active = 0 WHERE guild_id = ? AND betting_day = ? AND is_active = 1",
+                (guild_id, betting_day)
+            )
+            if cursor.rowcount == 0:
+                return False
+            
+            # Winners have a balance row from placing their bet. BEGIN IMMEDIATE holds SQLite's write lock for the
+            # whole settlement, and every call runs on the single DB executor thread, so no other writer interleaves
+            cursor.executemany(
+                "UPDATE gambling_balances SET balance = balance + ? WHERE guild_id = ? AND user_id = ?",
+                [(amount, guild_id, user_id) for user_id, amount in payouts.items()]
+            )
+            for user_id, amount in payouts.items():
+                self._record(cursor, guild_id, user_id, amount, "payout")
+            
+            # Reset jackpot
             cursor.execute(
-                "INSERT INTO guild_settings (guild_id, channel_id, gambling_channel_id) VALUES (?, ?, ?)",
-                (guild_id, channel_id, channel_id)
+                "INSERT OR REPLACE INTO gambling_jackpots (guild_id, current_pot, multiplier, last_reset_day) VALUES (?, 0, 1, ?)",
+                (guild_id, betting_day)
             )
+        return True
+
+    def set_gambling_channel(self, guild_id: int, channel_id: int):
+        """Set the gambling channel for a guild."""
+        with self._cursor() as cursor:
+        
+            # Check if guild settings exist
+            cursor.execute("SELECT gambling_channel_id FROM guild_settings WHERE guild_id = ?", (guild_id,))
+            result = cursor.fetchone()
         
-        conn.commit()
-        conn.close()
+            if result is not None:
+                # Update existing record
+                cursor.execute(
+                    "UPDATE guild_settings SET gambling_channel_id = ? WHERE guild_id = ?",
+                    (channel_id, guild_id)
+                )
+            else:
+                # Insert new record (we need a notification channel_id, so we'll use the gambling channel as default)
+                cursor.execute(
+                    "INSERT INTO guild_settings (guild_id, channel_id, gambling_channel_id) VALUES (?, ?, ?)",
+                    (guild_id, channel_id, channel_id)
+                )
+        
+        self._guild_settings_cache.pop(guild_id, None)
 
     def get_gambling_channel(self, guild_id: int) -> Optional[int]:
         """Get the gambling channel for a guild."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute("SELECT gambling_channel_id FROM guild_settings WHERE guild_id = ?", (guild_id,))
-        result = cursor.fetchone()
-        conn.close()
+        result = self._get_guild_settings(guild_id)
         if result:
-            return result[0]
+            return result[1]
         return None
 
     # --- Patch Tracking Methods ---
     
     def get_stored_file_hash(self, file_path: str) -> Optional[str]:
         """Get the stored hash for a file path."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute("SELECT file_hash FROM patch_files WHERE file_path = ?", (file_path,))
-        result = cursor.fetchone()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute("SELECT file_hash FROM patch_files WHERE file_path = ?", (file_path,))
+            result = cursor.fetchone()
         if result:
             return result[0]
         return None
@@ -425,31 +870,35 @@ class Database:
     def update_file_hash(self, file_path: str, file_hash: str):
         """Update or insert a file hash record."""
         import time
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO patch_files (file_path, file_hash, last_updated)
-            VALUES (?, ?, ?)
-        ''', (file_path, file_hash, int(time.time())))
-        conn.commit()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO patch_files (file_path, file_hash, last_updated)
+                VALUES (?, ?, ?)
+            ''', (file_path, file_hash, int(time.time())))
 
     def get_all_stored_files(self) -> List[Tuple[str, str]]:
         """Get all stored file records (path, hash)."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute("SELECT file_path, file_hash FROM patch_files")
-        results = cursor.fetchall()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute("SELECT file_path, file_hash FROM patch_files")
+            results = cursor.fetchall()
         return results
 
+    def apply_file_diff(self, upserts: List[Tuple[str, str]], removed: List[str]):
+        """Write a manifest diff in one transaction: upsert (path, hash) pairs and delete removed paths."""
+        import time
+        now = int(time.time())
+        with self._cursor() as cursor:
+            cursor.executemany(
+                "INSERT OR REPLACE INTO patch_files (file_path, file_hash, last_updated) VALUES (?, ?, ?)",
+                [(path, file_hash, now) for path, file_hash in upserts]
+            )
+            cursor.executemany("DELETE FROM patch_files WHERE file_path = ?", [(path,) for path in removed])
+
     def get_stored_version(self) -> Optional[Tuple[str, str]]:
         """Get the stored version and UID. Returns (version, uid) or None."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute("SELECT version, uid FROM patch_version ORDER BY last_updated DESC LIMIT 1")
-        result = cursor.fetchone()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute("SELECT version, uid FROM patch_version ORDER BY last_updated DESC LIMIT 1")
+            result = cursor.fetchone()
         if result:
             return result[0], result[1]
         return None
@@ -457,11 +906,154 @@ class Database:
     def update_version(self, version: str, uid: str):
         """Update or insert version and UID record."""
         import time
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO patch_version (version, uid, last_updated)
-            VALUES (?, ?, ?)
-        ''', (version, uid, int(time.time())))
-        conn.commit()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute('''
+                INSERT INTO patch_version (version, uid, last_updated)
+                VALUES (?, ?, ?)
+            ''', (version, uid, int(time.time())))
+
+    # --- Realm State Methods ---
+
+    def get_realm_states(self) -> Dict[str, dict]:
+        """Get the last known state of every server, in the server_status.server_states format."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT server_name, online, last_online, last_change FROM realm_state")
+            results = cursor.fetchall()
+        return {
+            name: {
+                "online": bool(online),
+                "lastOnline": None if last_online is None else bool(last_online),
+                "lastChange": last_change
+            }
+            for name, online, last_online, last_change in results
+        }
+
+    def save_realm_states(self, states: Dict[str, dict]):
+        """Store the current state of every server."""
+        with self._cursor() as cursor:
+            cursor.executemany('''
+                INSERT OR REPLACE INTO realm_state (server_name, online, last_online, last_change)
+                VALUES (?, ?, ?, ?)
+            ''', [
+                (name, int(state.get("online", False)),
+                 None if state.get("lastOnline") is None else int(state["lastOnline"]),
+                 state.get("lastChange"))
+                for name, state in states.items()
+            ])
+
+    def get_guild_realm_states(self) -> Dict[int, dict]:
+        """Get the realm state last delivered to each guild."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT guild_id, auth, kezan, gurubashi FROM guild_realm_state")
+            results = cursor.fetchall()
+        return {
+            guild_id: {"auth": bool(auth), "kezan": bool(kezan), "gurubashi": bool(gurubashi)}
+            for guild_id, auth, kezan, gurubashi in results
+        }
+
+    def save_guild_realm_states(self, states: Dict[int, dict]):
+        """Store the realm state delivered to each guild in a single transaction."""
+        import time
+        now = int(time.time())
+        with self._cursor() as cursor:
+            cursor.executemany('''
+                INSERT OR REPLACE INTO guild_realm_state (guild_id, auth, kezan, gurubashi, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [
+                (guild_id, int(state["auth"]), int(state["kezan"]), int(state["gurubashi"]), now)
+                for guild_id, state in states.items()
+            ])
+
+    # --- Git Watch Methods ---
+
+    def get_git_watch_state(self) -> Dict[Tuple[str, str], str]:
+        """Get the last seen head SHA of every watched (repo, branch)."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT repo, branch, last_sha FROM git_watch_state")
+            results = cursor.fetchall()
+        return {(repo, branch): sha for repo, branch, sha in results}
+
+    def save_git_watch_sha(self, repo: str, branch: str, sha: str):
+        """Store the latest seen head SHA for a branch."""
+        import time
+        with self._cursor() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO git_watch_state (repo, branch, last_sha, updated_at) VALUES (?, ?, ?, ?)",
+                (repo, branch, sha, int(time.time()))
+            )
+
+    def set_git_channel(self, guild_id: int, channel_id: int):
+        """Set the channel that receives new-commit notifications for a guild."""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO git_subscriptions (guild_id, channel_id) VALUES (?, ?)",
+                (guild_id, channel_id)
+            )
+
+    def remove_git_channel(self, guild_id: int) -> bool:
+        """Stop new-commit notifications for a guild. Returns False if none were set up."""
+        with self._cursor() as cursor:
+            cursor.execute("DELETE FROM git_subscriptions WHERE guild_id = ?", (guild_id,))
+            return cursor.rowcount > 0
+
+    def get_git_subscriptions(self) -> List[Tuple[int, int]]:
+        """Get (guild_id, channel_id) for every guild subscribed to commit notifications."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT guild_id, channel_id FROM git_subscriptions")
+            results = cursor.fetchall()
+        return results
+
+    def add_watched_repo(self, guild_id: int, repo_spec: str) -> bool:
+        """Watch an extra "owner/repo:branch" for a guild. Returns False if it was already watched."""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "INSERT OR IGNORE INTO git_watch_repos (guild_id, repo_spec) VALUES (?, ?)",
+                (guild_id, repo_spec)
+            )
+            return cursor.rowcount > 0
+
+    def remove_watched_repo(self, guild_id: int, repo_spec: str) -> bool:
+        """Stop watching an extra repo for a guild. Returns False if it was not watched."""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM git_watch_repos WHERE guild_id = ? AND repo_spec = ?",
+                (guild_id, repo_spec)
+            )
+            return cursor.rowcount > 0
+
+    def get_watched_repos(self) -> List[Tuple[int, str]]:
+        """Get (guild_id, repo_spec) for every per-guild watched repo."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT guild_id, repo_spec FROM git_watch_repos")
+            results = cursor.fetchall()
+        return results
+
+
+class AsyncDatabase:
+    """
+    Awaitable facade over Database. Every method of the wrapped Database is exposed as a
+    coroutine that runs on a dedicated DB thread, so SQLite work (and waiting on the file
+    lock) never blocks the event loop. Calls queue up on that thread in the order they were made.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+
+    def __getattr__(self, name):
+        attr = getattr(self.db, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(attr, *args, **kwargs))
+
+        call.__name__ = name
+        return call
+
+    async def close(self):
+        """Finish queued calls, then close the connection."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.db.close)
+        self._executor.shutdown(wait=True)
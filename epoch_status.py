@@ -2,9 +2,14 @@ import os
 from dotenv import load_dotenv
 import discord
 import asyncio
+import statistics
+import time
 from datetime import datetime, timezone
-from db import Database
-from server_status import poll_servers, check_patch_updates
+from db import Database, AsyncDatabase
+from server_status import SERVERS, set_database, poll_servers, load_server_states, check_patch_updates, format_manifest_stats, format_file_diff, AdaptivePollScheduler, get_http_session, close_http_session, get_http_stats
+
+# Used to measure restart-to-first-poll and restart-to-first-notification times
+STARTED_AT = time.monotonic()
 
 # Load environment variables from .env if present
 load_dotenv()
@@ -12,7 +17,9 @@ load_dotenv()
 DATABASE_FILE = os.environ.get("DATABASE_FILE", "bot_settings.db")
 
 # --- Database Instance ---
-db = Database(DATABASE_FILE)
+# All calls run on a dedicated DB thread via the async facade
+db = AsyncDatabase(Database(DATABASE_FILE))
+set_database(db)
 from discord.ext import tasks, commands
 
 
@@ -28,6 +35,25 @@ try:
 except ValueError: # double check if it's a valid integer
     CHECK_INTERVAL_SECONDS = 15
 
+# Optional: adaptive polling. CHECK_INTERVAL_SECONDS is the base interval right after a status change;
+# POLL_FAST_SECONDS is used while Auth is up and the worlds are down, decaying back to the base interval
+# (doubling every POLL_FAST_WINDOW_SECONDS) if that lasts; steady periods back off
+# (doubling every POLL_STEADY_AFTER_SECONDS) up to POLL_MAX_SECONDS. POLL_JITTER is a +/- fraction.
+try:
+    POLL_FAST_SECONDS = float(os.environ.get("POLL_FAST_SECONDS", "3"))
+    POLL_FAST_WINDOW_SECONDS = float(os.environ.get("POLL_FAST_WINDOW_SECONDS", "600"))
+    POLL_MAX_SECONDS = float(os.environ.get("POLL_MAX_SECONDS", "180"))
+    POLL_STEADY_AFTER_SECONDS = float(os.environ.get("POLL_STEADY_AFTER_SECONDS", "300"))
+    POLL_JITTER = float(os.environ.get("POLL_JITTER", "0.1"))
+except ValueError:
+    POLL_FAST_SECONDS, POLL_FAST_WINDOW_SECONDS, POLL_MAX_SECONDS, POLL_STEADY_AFTER_SECONDS, POLL_JITTER = 3, 600, 180, 300, 0.1
+
+# Optional: NOTIFY_CONCURRENCY (max guilds notified at the same time)
+try:
+    NOTIFY_CONCURRENCY = int(os.environ.get("NOTIFY_CONCURRENCY", "25"))
+except ValueError:
+    NOTIFY_CONCURRENCY = 25
+
 # Optional: COMMAND_PREFIX
 COMMAND_PREFIX = os.environ.get("COMMAND_PREFIX", "!")
 
@@ -38,7 +64,27 @@ intents.guilds = True
 intents.messages = True
 intents.message_content = True
 
-bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents)
+class EpochBot(commands.Bot):
+    async def close(self):
+        """
+        Stop the background loops, cogs and Discord connection first, then shut down the shared
+        HTTP session and the database they use.
+        """
+        if self.is_closed():
+            return
+        # The module-level loops aren't owned by a cog, so unloading extensions doesn't stop them
+        loops = (check_realm_status, check_patch_updates_task)
+        running = [loop.get_task() for loop in loops if loop.is_running()]
+        for loop in loops:
+            loop.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        await super().close()
+        stats = get_http_stats()
+        print(f"Closing HTTP session: {stats['requests']} requests, {stats['connections_created']} connections opened, {stats['connections_reused']} reused.")
+        await close_http_session()
+        await db.close()
+
+bot = EpochBot(command_prefix=COMMAND_PREFIX, intents=intents)
 
 # Store database instance on bot for cogs to access
 bot.db = db
@@ -56,6 +102,9 @@ async def setup_hook():
         'cogs.patch'
     ]
     
+    # Shared, connection-pooled HTTP session used by server_status.py and the cogs
+    bot.http_session = await get_http_session()
+
     for cog in cogs_to_load:
         try:
             await bot.load_extension(cog)
@@ -68,69 +117,291 @@ bot.setup_hook = setup_hook
 
 # Helper functions for background task - keep these in main file since they're used by the background loop
 async def get_notification_channel(guild_id: int) -> int | None:
-    return db.get_notification_channel(guild_id)
+    return await db.get_notification_channel(guild_id)
 
 async def get_optin_users(guild_id: int):
-    return db.get_optin_users(guild_id)
+    return await db.get_optin_users(guild_id)
+
+# --- Notification Fan-out Helpers ---
+def compute_transitions(prev: dict, auth_online: bool, kezan_online: bool, gurubashi_online: bool) -> list:
+    """
+    Works out which notifications a status change produces, in send order.
+    Returns a list of (event, server_name) tuples.
+    """
+    events = []
+    if auth_online and not prev["auth"]:
+        events.append(("auth_online", "Auth"))
+
+    # Kezan world server notification (opt-in users) only if both auth and Kezan are up
+    if auth_online and kezan_online and not prev["kezan"]:
+        events.append(("kezan_verify", "Kezan"))
+
+    # World server notifications (standalone, when auth is offline)
+    if not auth_online:
+        for server_name, current_status, previous_status in (
+            ("Kezan", kezan_online, prev["kezan"]),
+            ("Gurubashi", gurubashi_online, prev["gurubashi"])
+        ):
+            if current_status and not previous_status:
+                events.append(("world_online", server_name))
+
+    # World server offline notifications (when any world server goes offline)
+    for server_name, current_status, previous_status in (
+        ("Kezan", kezan_online, prev["kezan"]),
+        ("Gurubashi", gurubashi_online, prev["gurubashi"])
+    ):
+        if not current_status and previous_status:
+            events.append(("world_offline", server_name))
+
+    # Auth server offline notification
+    if not auth_online and prev["auth"]:
+        events.append(("auth_offline", "Auth"))
+
+    return events
+
+async def send_auth_online(guild, channel):
+    msg = await channel.send("The Project Epoch auth server is now **ONLINE**! You may be able to log in soon.")
+    # Add :bait: reaction for the guild 'High Tempo' (EPOCH)
+    if guild.name == "High Tempo" or guild.name.startswith("High Tempo"):
+        # Try to find a custom emoji named 'bait' in the guild
+        bait_emoji = discord.utils.get(guild.emojis, name="bait")
+        try:
+            if bait_emoji:
+                await msg.add_reaction(bait_emoji)
+            else:
+                await msg.add_reaction(":bait:") # fallback, may error if not a unicode emoji
+        except Exception as e:
+            print(f"[notifyme] Could not add :bait: reaction: {e}")
+    print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild.id}): Auth server online message sent to channel {channel.name}.")
+
+async def post_kezan_verification(guild, channel):
+    """Posts the "Verifying..." placeholder for a guild and returns it so the shared verdict can resolve it."""
+    verification_msg = await channel.send("🔍 **Both Auth and Kezan servers detected online!** Verifying in 10 seconds to reduce false positives...")
+    print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild.id}): Both Auth and Kezan detected online. Waiting for launch verification before sending opt-in notifications...")
+    return verification_msg
+
+async def verify_launch() -> dict | None:
+    """
+    Waits 10 seconds and re-checks server status once to reduce false positives.
+    Returns {"auth": bool, "kezan": bool} for every guild to consume, or None if the re-check failed.
+    """
+    print(f"[{discord.utils.utcnow()}] Both Auth and Kezan detected online. Waiting 10s to reduce chance of a false positive...")
+    await asyncio.sleep(10)
+
+    try:
+        verification_data = await poll_servers()
+    except Exception as e:
+        print(f"[{discord.utils.utcnow()}] Launch verification poll failed: {e}")
+        verification_data = None
+    if not verification_data:
+        print(f"[{discord.utils.utcnow()}] Launch verification check failed - unable to re-check server status.")
+        return None
+
+    verdict = {
+        "auth": verification_data.get("Auth", {}).get("online", False),
+        "kezan": verification_data.get("Kezan", {}).get("online", False)
+    }
+    print(f"[{discord.utils.utcnow()}] Launch verification {'passed' if verdict['auth'] and verdict['kezan'] else 'failed'} - Auth: {'ON' if verdict['auth'] else 'OFF'}, Kezan: {'ON' if verdict['kezan'] else 'OFF'}")
+    return verdict
+
+async def resolve_kezan_verification(guild, channel, verification_msg, verdict: dict | None):
+    """Replaces a guild's "Verifying..." placeholder with the outcome of the shared launch verification."""
+    guild_id = guild.id
+    if verdict is None:
+        # Verification check failed completely
+        try:
+            await verification_msg.edit(content="⚠️ **Verification check failed** - Unable to re-check server status. No notifications sent.")
+        except:
+            await channel.send("⚠️ **Verification check failed** - Unable to re-check server status. No notifications sent.")
+        print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Verification check failed. Skipping opt-in notifications.")
+        return
+
+    if not (verdict["auth"] and verdict["kezan"]):
+        # Servers went offline during verification - update the verification message
+        try:
+            await verification_msg.edit(content="❌ **Verification failed** - Servers went offline during check.")
+        except:
+            await channel.send("❌ **Verification failed** - Servers went offline during check.")
+        print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Verification failed. Skipping opt-in notifications.")
+        return
+
+    # Both servers still online after verification - delete verification message and send real notification
+    try:
+        await verification_msg.delete()
+    except:
+        pass  # Don't fail if we can't delete the message
+
+    optin_users = await get_optin_users(guild_id)
+    if optin_users:
+        mentions = ' '.join(f'<@{uid}>' for uid, _ in optin_users)
+        await channel.send(
+            f"{mentions} The Project Epoch realm **Kezan** is now **ONLINE**! Go Go Go!"
+        )
+        print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Kezan is online (verified). Sent opt-in user pings to channel {channel.name}. Opt-ins: {[uname for _, uname in optin_users]}")
+    else:
+        await channel.send(
+            "The Project Epoch realm **Kezan** is now **ONLINE**! (No users have opted in for notifications.)"
+        )
+        print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Kezan is online (verified). No opt-in users to ping in channel {channel.name}.")
+
+async def deliver_guild_notifications(guild, channel, events: list):
+    """
+    Sends one guild's notifications in order. Errors are logged per notification so one failure doesn't block the rest.
+    Returns the Kezan "Verifying..." placeholder message if one was posted.
+    """
+    guild_id = guild.id
+    verification_msg = None
+    for event, server_name in events:
+        try:
+            if event == "auth_online":
+                await send_auth_online(guild, channel)
+            elif event == "kezan_verify":
+                verification_msg = await post_kezan_verification(guild, channel)
+            elif event == "world_online":
+                await channel.send(f"The Project Epoch realm **{server_name}** is now **ONLINE**! (Auth server still offline)")
+                print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): {server_name} world server online (auth offline) message sent to channel {channel.name}.")
+            elif event == "world_offline":
+                await channel.send(f"🔴 The Project Epoch realm **{server_name}** is now **OFFLINE**.")
+                print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): {server_name} world server offline message sent to channel {channel.name}.")
+            elif event == "auth_offline":
+                await channel.send("🔴 The Project Epoch **Auth server** is now **OFFLINE**.")
+                print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Auth server offline message sent to channel {channel.name}.")
+        except discord.Forbidden:
+            print(f"[{discord.utils.utcnow()}] Error: Bot does not have permissions to send messages in channel '{channel.name}' ({channel.id}) in guild '{guild.name}' ({guild_id}).")
+        except Exception as e:
+            print(f"[{discord.utils.utcnow()}] Error sending {server_name} {event} message to guild '{guild.name}' ({guild_id}): {e}")
+    return verification_msg
+
+async def resolve_guild_verification(guild, channel, verification_msg, verdict: dict | None):
+    try:
+        await resolve_kezan_verification(guild, channel, verification_msg, verdict)
+    except discord.Forbidden:
+        print(f"[{discord.utils.utcnow()}] Error: Bot does not have permissions to send messages in channel '{channel.name}' ({channel.id}) in guild '{guild.name}' ({guild.id}).")
+    except Exception as e:
+        print(f"[{discord.utils.utcnow()}] Error sending Kezan message to guild '{guild.name}' ({guild.id}): {e}")
+
+async def fan_out(jobs: list, send) -> list:
+    """
+    Runs send(guild, channel, *args) for every (guild, channel, *args) job concurrently,
+    at most NOTIFY_CONCURRENCY at a time.
+    Returns (latency, result) per job, with latency measured from the start of the fan-out.
+    """
+    semaphore = asyncio.Semaphore(NOTIFY_CONCURRENCY)
+    started = time.monotonic()
+
+    async def deliver(job):
+        async with semaphore:
+            result = await send(*job)
+        return time.monotonic() - started, result
+
+    return await asyncio.gather(*(deliver(job) for job in jobs))
+
+def log_delivery_latency(stage: str, latencies: list):
+    if not latencies:
+        return
+    latencies = sorted(latencies)
+    print(f"[{discord.utils.utcnow()}] {stage} {len(latencies)} guild(s) - first: {latencies[0]:.2f}s, median: {statistics.median(latencies):.2f}s, last: {latencies[-1]:.2f}s")
 
 # --- Background Task for Status Checking ---
+poll_scheduler = AdaptivePollScheduler(
+    base_interval=CHECK_INTERVAL_SECONDS,
+    fast_interval=POLL_FAST_SECONDS,
+    fast_window=POLL_FAST_WINDOW_SECONDS,
+    max_interval=POLL_MAX_SECONDS,
+    steady_after=POLL_STEADY_AFTER_SECONDS,
+    jitter=POLL_JITTER
+)
+
 @tasks.loop(seconds=CHECK_INTERVAL_SECONDS)
 async def check_realm_status():
     """
-    Periodically polls server status and sends Discord notifications
-    to all configured channels when status changes.
+    Polls server status, sends notifications for any changes, then reschedules
+    itself based on the realm state (see AdaptivePollScheduler).
+    """
+    try:
+        current = await run_realm_status_check()
+    except Exception as e:
+        # Never let one bad iteration stop the loop for good
+        print(f"[{discord.utils.utcnow()}] Realm status check failed: {e}")
+        current = None
+    if current is None:
+        interval = poll_scheduler.failure_interval()
+    else:
+        interval = poll_scheduler.next_interval(current["auth"], current["kezan"], current["gurubashi"])
+    check_realm_status.change_interval(seconds=interval)
+
+async def run_realm_status_check() -> dict | None:
+    """
+    Polls server status and sends Discord notifications to all configured
+    channels when status changes. Returns the polled status, or None if polling failed.
     """
-    
-    # Check if this is the first run (startup grace period)
-    if not hasattr(check_realm_status, "startup_complete"):
-        check_realm_status.startup_complete = False
-        check_realm_status.startup_checks = 0
     
     # Poll servers for current status
     try:
         server_data = await poll_servers()
     except Exception as e:
         print(f"[{discord.utils.utcnow()}] Server polling failed: {e}")
-        return
+        return None
     
     if not server_data:
         print(f"[{discord.utils.utcnow()}] Server polling returned empty data, skipping notification check.")
-        return
+        return None
+    polled_at = int(time.time())
 
     # Get server status from polling results
     auth_server_status = server_data.get("Auth", {}).get("online", False)
     kezan_online = server_data.get("Kezan", {}).get("online", False)
     gurubashi_online = server_data.get("Gurubashi", {}).get("online", False)
-
-    # Track last known status for auth and both world servers per guild
-    if not hasattr(check_realm_status, "last_status"):
-        check_realm_status.last_status = {}
-
-    # Startup grace period: Don't send notifications for the first 3 checks (45 seconds)
-    # This prevents spam when restarting the bot if servers are already online
-    if not check_realm_status.startup_complete:
-        check_realm_status.startup_checks += 1
-        if check_realm_status.startup_checks >= 3:
-            check_realm_status.startup_complete = True
-            print(f"[{discord.utils.utcnow()}] Startup grace period complete. Will now send notifications for status changes.")
-        else:
-            print(f"[{discord.utils.utcnow()}] Startup grace period: Check {check_realm_status.startup_checks}/3. Not sending notifications yet.")
-            # Initialize status tracking during grace period
-            for guild in bot.guilds:
-                guild_id = guild.id
-                if guild_id not in check_realm_status.last_status:
-                    check_realm_status.last_status[guild_id] = {
-                        "auth": auth_server_status,
-                        "kezan": kezan_online,
-                        "gurubashi": gurubashi_online
-                    }
-                else:
-                    # Update status during grace period
-                    check_realm_status.last_status[guild_id]["auth"] = auth_server_status
-                    check_realm_status.last_status[guild_id]["kezan"] = kezan_online
-                    check_realm_status.last_status[guild_id]["gurubashi"] = gurubashi_online
-            return
-
+    current = {
+        "auth": auth_server_status,
+        "kezan": kezan_online,
+        "gurubashi": gurubashi_online
+    }
+
+    if not check_realm_status.first_poll_logged:
+        check_realm_status.first_poll_logged = True
+        print(f"[{discord.utils.utcnow()}] First realm poll completed {time.monotonic() - STARTED_AT:.1f}s after start.")
+
+    # A launch is the realm-wide Auth+Kezan transition to up, judged against the saved realm state rather than
+    # any one guild's (a newly configured guild starts from all-offline). Announced at most once until Auth goes down.
+    prev_realm = check_realm_status.saved_realm
+    realm_launch = (
+        prev_realm is not None and not (prev_realm["auth"] and prev_realm["kezan"])
+        and auth_server_status and kezan_online and not check_realm_status.launch_dispatched
+    )
+    if not auth_server_status:
+        check_realm_status.launch_dispatched = False
+
+    # Persist the realm state whenever it changes
+    if current != check_realm_status.saved_realm or check_realm_status.realm_save_pending:
+        check_realm_status.saved_realm = dict(current)
+        try:
+            await db.save_realm_states({name: state for name, state in server_data.items() if name in SERVERS})
+            check_realm_status.realm_save_pending = False
+        except Exception as e:
+            # Retried on the next poll
+            check_realm_status.realm_save_pending = True
+            print(f"[{discord.utils.utcnow()}] Failed to save realm state: {e}")
+
+    # Fresh database with nothing to compare against: record the current state silently
+    # instead of announcing everything that is already online
+    if check_realm_status.seed_from_first_poll:
+        check_realm_status.seed_from_first_poll = False
+        for guild in bot.guilds:
+            check_realm_status.last_status[guild.id] = dict(current)
+        try:
+            await db.save_guild_realm_states({guild.id: current for guild in bot.guilds})
+        except Exception as e:
+            print(f"[{discord.utils.utcnow()}] Failed to save guild realm states: {e}")
+        print(f"[{discord.utils.utcnow()}] No stored realm state found. Recorded current state for {len(bot.guilds)} guild(s) without notifying.")
+        return current
+
+    # Work out each guild's notifications. Guilds almost always share the same previous
+    # state, so the transition is computed once per distinct previous state.
+    transitions = {}
+    deliveries = []
+    changed_states = {}
+    unchanged = 0
     for guild in bot.guilds:
         guild_id = guild.id
         configured_channel_id = await get_notification_channel(guild_id)
@@ -143,137 +414,82 @@ async def check_realm_status():
             continue
 
         # Initialize last status for this guild
-        if guild_id not in check_realm_status.last_status:
-            check_realm_status.last_status[guild_id] = {
-                "auth": False,
-                "kezan": False,
-                "gurubashi": False
-            }
-        prev_auth = check_realm_status.last_status[guild_id]["auth"]
-        prev_kezan = check_realm_status.last_status[guild_id]["kezan"]
-        prev_gurubashi = check_realm_status.last_status[guild_id]["gurubashi"]
-
-        # Auth server notification (non-@everyone)
-        if auth_server_status and not prev_auth:
-            try:
-                msg = await channel.send("The Project Epoch auth server is now **ONLINE**! You may be able to log in soon.")
-                # Add :bait: reaction for the guild 'High Tempo' (EPOCH)
-                if guild.name == "High Tempo" or guild.name.startswith("High Tempo"):
-                    # Try to find a custom emoji named 'bait' in the guild
-                    bait_emoji = discord.utils.get(guild.emojis, name="bait")
-                    try:
-                        if bait_emoji:
-                            await msg.add_reaction(bait_emoji)
-                        else:
-                            await msg.add_reaction(":bait:") # fallback, may error if not a unicode emoji
-                    except Exception as e:
-                        print(f"[notifyme] Could not add :bait: reaction: {e}")
-                print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Auth server online message sent to channel {channel.name}.")
-            except Exception as e:
-                print(f"[{discord.utils.utcnow()}] Error sending auth server message to guild '{guild.name}' ({guild_id}): {e}")
-
-        # Kezan world server notification (opt-in users) only if both auth and Kezan are up
-        if auth_server_status and kezan_online and not prev_kezan:
-            try:
-                # Send initial detection message
-                verification_msg = await channel.send("🔍 **Both Auth and Kezan servers detected online!** Verifying in 10 seconds to reduce false positives...")
-                
-                # Wait 10 seconds and re-check to prevent false positives
-                print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Both Auth and Kezan detected online. Waiting 10s to reduce chance of a false positive before sending opt-in notifications...")
-                await asyncio.sleep(10)
-                
-                # Re-check server status after delay
-                verification_data = await poll_servers()
-                if verification_data:
-                    auth_verified = verification_data.get("Auth", {}).get("online", False)
-                    kezan_verified = verification_data.get("Kezan", {}).get("online", False)
-                    
-                    if auth_verified and kezan_verified:
-                        # Both servers still online after verification - delete verification message and send real notification
-                        try:
-                            await verification_msg.delete()
-                        except:
-                            pass  # Don't fail if we can't delete the message
-                            
-                        optin_users = await get_optin_users(guild_id)
-                        if optin_users:
-                            mentions = ' '.join(f'<@{uid}>' for uid, _ in optin_users)
-                            await channel.send(
-                                f"{mentions} The Project Epoch realm **Kezan** is now **ONLINE**! Go Go Go!"
-                            )
-                            print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Kezan is online (verified). Sent opt-in user pings to channel {channel.name}. Opt-ins: {[uname for _, uname in optin_users]}")
-                        else:
-                            await channel.send(
-                                "The Project Epoch realm **Kezan** is now **ONLINE**! (No users have opted in for notifications.)"
-                            )
-                            print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Kezan is online (verified). No opt-in users to ping in channel {channel.name}.")
-                    else:
-                        # Servers went offline during verification - update the verification message
-                        try:
-                            await verification_msg.edit(content="❌ **Verification failed** - Servers went offline during check.")
-                        except:
-                            await channel.send("❌ **Verification failed** - Servers went offline during check.")
-                        print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Verification failed - Auth: {'ON' if auth_verified else 'OFF'}, Kezan: {'ON' if kezan_verified else 'OFF'}. Skipping opt-in notifications.")
-                else:
-                    # Verification check failed completely
-                    try:
-                        await verification_msg.edit(content="⚠️ **Verification check failed** - Unable to re-check server status. No notifications sent.")
-                    except:
-                        await channel.send("⚠️ **Verification check failed** - Unable to re-check server status. No notifications sent.")
-                    print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Verification check failed. Skipping opt-in notifications.")
-            except discord.Forbidden:
-                print(f"[{discord.utils.utcnow()}] Error: Bot does not have permissions to send messages in channel '{channel.name}' ({configured_channel_id}) in guild '{guild.name}' ({guild_id}).")
-            except Exception as e:
-                print(f"[{discord.utils.utcnow()}] Error sending Kezan message to guild '{guild.name}' ({guild_id}): {e}")
-
-        # World server notifications (standalone, when auth is offline)
-        if not auth_server_status and (kezan_online or gurubashi_online):
-            # Check world servers dynamically
-            world_servers = [
-                ("Kezan", kezan_online, prev_kezan),
-                ("Gurubashi", gurubashi_online, prev_gurubashi)
-            ]
-            
-            for server_name, current_status, previous_status in world_servers:
-                if current_status and not previous_status:
-                    try:
-                        await channel.send(f"The Project Epoch realm **{server_name}** is now **ONLINE**! (Auth server still offline)")
-                        print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): {server_name} world server online (auth offline) message sent to channel {channel.name}.")
-                    except Exception as e:
-                        print(f"[{discord.utils.utcnow()}] Error sending standalone {server_name} message to guild '{guild.name}' ({guild_id}): {e}")
-
-        # World server offline notifications (when any world server goes offline)
-        if kezan_online or gurubashi_online or prev_kezan or prev_gurubashi:
-            # Check world servers for offline transitions
-            world_servers_offline = [
-                ("Kezan", kezan_online, prev_kezan),
-                ("Gurubashi", gurubashi_online, prev_gurubashi)
-            ]
-            
-            for server_name, current_status, previous_status in world_servers_offline:
-                if not current_status and previous_status:
-                    try:
-                        await channel.send(f"🔴 The Project Epoch realm **{server_name}** is now **OFFLINE**.")
-                        print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): {server_name} world server offline message sent to channel {channel.name}.")
-                    except Exception as e:
-                        print(f"[{discord.utils.utcnow()}] Error sending {server_name} offline message to guild '{guild.name}' ({guild_id}): {e}")
-
-        # Auth server offline notification
-        if not auth_server_status and prev_auth:
-            try:
-                await channel.send("🔴 The Project Epoch **Auth server** is now **OFFLINE**.")
-                print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Auth server offline message sent to channel {channel.name}.")
-            except Exception as e:
-                print(f"[{discord.utils.utcnow()}] Error sending Auth server offline message to guild '{guild.name}' ({guild_id}): {e}")
+        prev = check_realm_status.last_status.setdefault(guild_id, {
+            "auth": False,
+            "kezan": False,
+            "gurubashi": False
+        })
+        prev_key = (prev["auth"], prev["kezan"], prev["gurubashi"])
+        if prev_key not in transitions:
+            transitions[prev_key] = compute_transitions(prev, auth_server_status, kezan_online, gurubashi_online)
+        events = transitions[prev_key]
+
+        if events:
+            deliveries.append((guild, channel, events))
+        if prev == current:
+            unchanged += 1
+        else:
+            changed_states[guild_id] = dict(current)
 
         # Update last known status
-        check_realm_status.last_status[guild_id]["auth"] = auth_server_status
-        check_realm_status.last_status[guild_id]["kezan"] = kezan_online
-        check_realm_status.last_status[guild_id]["gurubashi"] = gurubashi_online
-
-        # Log status if nothing changed
-        if (auth_server_status == prev_auth) and (kezan_online == prev_kezan) and (gurubashi_online == prev_gurubashi):
-            print(f"[{discord.utils.utcnow()}] Guild '{guild.name}' ({guild_id}): Auth server is {'ONLINE' if auth_server_status else 'OFFLINE'}, Kezan is {'ONLINE' if kezan_online else 'OFFLINE'}, Gurubashi is {'ONLINE' if gurubashi_online else 'OFFLINE'} (no change).")
+        check_realm_status.last_status[guild_id] = dict(current)
+
+    pending = []
+    if deliveries:
+        results = await fan_out(deliveries, deliver_guild_notifications)
+        log_delivery_latency("Delivered to", [latency for latency, _ in results])
+
+        # One launch verification is shared by every guild that posted a "Verifying..." placeholder
+        pending = [
+            (guild, channel, verification_msg)
+            for (guild, channel, _), (_, verification_msg) in zip(deliveries, results)
+            if verification_msg is not None
+        ]
+
+        if not check_realm_status.first_delivery_logged:
+            check_realm_status.first_delivery_logged = True
+            print(f"[{discord.utils.utcnow()}] First notification delivered {time.monotonic() - STARTED_AT:.1f}s after start.")
+
+    if pending or realm_launch:
+        verdict = await verify_launch()
+        if realm_launch and verdict and verdict["auth"] and verdict["kezan"]:
+            # Launch time is when this poll first saw both servers up; GamblingCog settles bets against it
+            check_realm_status.launch_dispatched = True
+            bot.dispatch("realm_launch_verified", polled_at)
+        if pending:
+            results = await fan_out([job + (verdict,) for job in pending], resolve_guild_verification)
+            log_delivery_latency("Resolved launch verification for", [latency for latency, _ in results])
+
+    # Persist the state each guild was last notified about
+    if changed_states:
+        try:
+            await db.save_guild_realm_states(changed_states)
+        except Exception as e:
+            print(f"[{discord.utils.utcnow()}] Failed to save guild realm states: {e}")
+
+    # Log status if nothing changed
+    if unchanged:
+        print(f"[{discord.utils.utcnow()}] Auth server is {'ONLINE' if auth_server_status else 'OFFLINE'}, Kezan is {'ONLINE' if kezan_online else 'OFFLINE'}, Gurubashi is {'ONLINE' if gurubashi_online else 'OFFLINE'} (no change, {unchanged} guild(s)).")
+
+    return current
+
+@check_realm_status.before_loop
+async def restore_realm_state():
+    """Reload the last known realm state so the first poll after a restart is already accurate."""
+    check_realm_status.last_status = await db.get_guild_realm_states()
+    realm_states = await db.get_realm_states()
+    load_server_states(realm_states)
+    check_realm_status.saved_realm = {
+        "auth": realm_states.get("Auth", {}).get("online", False),
+        "kezan": realm_states.get("Kezan", {}).get("online", False),
+        "gurubashi": realm_states.get("Gurubashi", {}).get("online", False)
+    } if realm_states else None
+    check_realm_status.seed_from_first_poll = not check_realm_status.last_status
+    check_realm_status.first_poll_logged = False
+    check_realm_status.launch_dispatched = False
+    check_realm_status.realm_save_pending = False
+    check_realm_status.first_delivery_logged = False
+    print(f"[{discord.utils.utcnow()}] Restored realm state for {len(check_realm_status.last_status)} guild(s) and {len(realm_states)} server(s).")
 
 
 # --- Background Task for Patch Checking ---
@@ -285,11 +501,19 @@ async def check_patch_updates_task():
     """
     
     try:
-        has_updates, manifest, updated_files = await check_patch_updates()
+        has_updates, manifest, file_diff = await check_patch_updates()
     except Exception as e:
         print(f"[{discord.utils.utcnow()}] Patch checking failed: {e}")
         return
     
+    # Log connection reuse and cache effectiveness once an hour
+    if check_patch_updates_task.current_loop % 60 == 0:
+        stats = get_http_stats()
+        print(f"[{discord.utils.utcnow()}] HTTP pool: {stats['requests']} requests, {stats['connections_created']} connections opened, {stats['connections_reused']} reused (handshakes saved).")
+        cache_stats = await db.get_cache_stats()
+        print(f"[{discord.utils.utcnow()}] Settings cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses ({cache_stats['guild_settings']} guilds, {cache_stats['optins']} opt-in lists cached).")
+        print(f"[{discord.utils.utcnow()}] Manifest today: {format_manifest_stats()}")
+
     if not has_updates or not manifest:
         return  # No updates or failed to get manifest
     
@@ -310,12 +534,13 @@ async def check_patch_updates_task():
             # Create patch notification embed
             embed = discord.Embed(
                 title="🆕 New Project Epoch Patch Available!",
-                description=f"**Version:** `{version}`\n**Files Updated:** {len(updated_files)}",
+                description=f"**Version:** `{version}`\n**Files:** {format_file_diff(file_diff)}",
                 color=0x00ff00,
                 timestamp=datetime.now(timezone.utc)
             )
             
             # Show first few updated files
+            updated_files = file_diff["added"] + file_diff["changed"]
             files_to_show = updated_files[:5]
             if files_to_show:
                 files_text = "\n".join([f"• `{file}`" for file in files_to_show])
@@ -365,8 +590,7 @@ async def on_ready():
     # Database is initialized on db instance creation
     # Start the status checking task
     if not check_realm_status.is_running():
-        print(f"Starting realm status check loop (every {CHECK_INTERVAL_SECONDS}s)...")
-        print(f"Note: First 3 checks (45s) will be silent to prevent restart spam.")
+        print(f"Starting realm status check loop (adaptive: {POLL_FAST_SECONDS:g}s-{POLL_MAX_SECONDS:g}s, base {CHECK_INTERVAL_SECONDS}s)...")
         check_realm_status.start()
     
     # Start the patch checking task
@@ -1,10 +1,22 @@
 import asyncio
-import socket
+import itertools
+import json
+import time
 import aiohttp
 import os
+import random
 from datetime import datetime, timezone
-from typing import Dict, Optional, List, Tuple
-from db import Database
+from typing import Dict, Optional, Tuple, Iterable, Iterator
+
+# Optional faster manifest parsers: ijson streams file entries, orjson decodes in one go
+try:
+    import ijson
+except ImportError:
+    ijson = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 SERVERS = {
     "Auth": {"host": "game.project-epoch.net", "port": 3724},
@@ -14,6 +26,151 @@ SERVERS = {
 
 server_states: Dict[str, dict] = {}
 
+# Fetches currently in progress, keyed by what they fetch (see _single_flight)
+_in_flight: Dict[str, asyncio.Task] = {}
+
+async def _single_flight(key: str, factory):
+    """
+    Await factory() with at most one call in flight per key; concurrent callers share its result.
+    The shared task is shielded so one caller being cancelled does not cancel it for the others.
+    """
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    return await asyncio.shield(task)
+
+# Result of the most recent successful poll (monotonic time), served to !status
+try:
+    STATUS_SNAPSHOT_MAX_AGE = float(os.environ.get("STATUS_SNAPSHOT_MAX_AGE", "60"))
+except ValueError:
+    STATUS_SNAPSHOT_MAX_AGE = 60.0
+status_snapshot = {"states": None, "polled_at": 0.0}
+
+# Storage handle shared with the bot and its cogs, injected once at startup
+_db = None
+
+def set_database(db):
+    """Sets the storage handle used by the patch checker."""
+    global _db
+    _db = db
+
+# Probe mode: "hedged" runs the API check alongside the socket probe, "sequential" only after it
+PROBE_MODE = os.environ.get("PROBE_MODE", "hedged").lower()
+# How long the socket probe gets on its own before the API request is started
+try:
+    PROBE_HEDGE_DELAY = float(os.environ.get("PROBE_HEDGE_DELAY", "0.5"))
+except ValueError:
+    PROBE_HEDGE_DELAY = 0.5
+# How hedged results are reconciled:
+#   first_online  - the first source to see a world server online wins, otherwise prefer_socket
+#   prefer_socket - socket result unless all offline / auth only, then the API result
+#   any_online    - wait for both and treat a server as online if either source says so
+PROBE_RECONCILE_POLICY = os.environ.get("PROBE_RECONCILE_POLICY", "first_online").lower()
+
+# --- Shared HTTP Client ---
+# One long-lived, connection-pooled session for all outbound HTTP so repeated polls of the
+# same hosts reuse keep-alive connections instead of paying a new TCP+TLS handshake each time.
+try:
+    HTTP_POOL_LIMIT = int(os.environ.get("HTTP_POOL_LIMIT", "20"))
+    HTTP_POOL_LIMIT_PER_HOST = int(os.environ.get("HTTP_POOL_LIMIT_PER_HOST", "4"))
+    # Longer than the 60s patch poll so its connection survives between checks
+    HTTP_KEEPALIVE_SECONDS = int(os.environ.get("HTTP_KEEPALIVE_SECONDS", "90"))
+except ValueError:
+    HTTP_POOL_LIMIT, HTTP_POOL_LIMIT_PER_HOST, HTTP_KEEPALIVE_SECONDS = 20, 4, 90
+
+_http_session: Optional[aiohttp.ClientSession] = None
+http_stats = {"requests": 0, "connections_created": 0, "connections_reused": 0}
+
+async def _on_request_end(session, context, params):
+    http_stats["requests"] += 1
+
+async def _on_connection_create_end(session, context, params):
+    http_stats["connections_created"] += 1
+
+async def _on_connection_reuseconn(session, context, params):
+    http_stats["connections_reused"] += 1
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Returns the shared HTTP session, creating it on first use (or after it was closed)."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_end.append(_on_request_end)
+        trace_config.on_connection_create_end.append(_on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=300,
+            keepalive_timeout=HTTP_KEEPALIVE_SECONDS
+        )
+        _http_session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+    return _http_session
+
+async def close_http_session():
+    """Closes the shared HTTP session. Called once when the bot shuts down."""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+def get_http_stats() -> dict:
+    """Returns request and connection counters; every reused connection is a handshake saved."""
+    return dict(http_stats)
+
+def load_server_states(states: Dict[str, dict]):
+    """Seeds server_states with persisted state so change tracking continues across restarts."""
+    for name, state in states.items():
+        if name in SERVERS:
+            server_states[name] = dict(state)
+
+class AdaptivePollScheduler:
+    """
+    Picks the delay before the next realm poll from the current realm state:
+    fast while Auth is up but the worlds are down (a launch is imminent), decaying back to the base
+    interval (doubling every fast_window) if that state lasts, the base interval right after a change,
+    and exponential back-off up to max_interval while nothing changes.
+    Every delay gets +/- jitter so polls don't line up with other clients.
+    """
+
+    def __init__(self, base_interval: float, fast_interval: float, max_interval: float,
+                 steady_after: float, jitter: float, fast_window: float = 600):
+        self.base_interval = base_interval
+        self.fast_interval = fast_interval
+        self.fast_window = fast_window
+        self.max_interval = max_interval
+        self.steady_after = steady_after
+        self.jitter = jitter
+        self.last_state: Optional[Tuple[bool, bool, bool]] = None
+        self.last_change = time.monotonic()
+
+    def next_interval(self, auth: bool, kezan: bool, gurubashi: bool) -> float:
+        now = time.monotonic()
+        state = (auth, kezan, gurubashi)
+        if state != self.last_state:
+            self.last_state = state
+            self.last_change = now
+
+        steady_for = now - self.last_change
+        if auth and not (kezan or gurubashi):
+            # Auth-only periods can last hours; only the first fast_window polls at the fast rate
+            doublings = min(int(steady_for // self.fast_window), 16)
+            interval = min(self.fast_interval * 2 ** doublings, max(self.base_interval, self.fast_interval))
+        else:
+            # Double the interval for every steady_after period without a change
+            doublings = min(int(steady_for // self.steady_after), 16)
+            interval = min(self.base_interval * 2 ** doublings, self.max_interval)
+        return self._jittered(interval)
+
+    def failure_interval(self) -> float:
+        """Delay after a failed poll: retry at the base interval."""
+        return self._jittered(self.base_interval)
+
+    def _jittered(self, interval: float) -> float:
+        return max(1.0, interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
 async def check_server(host: str, port: int) -> bool:
     try:
         reader, writer = await asyncio.wait_for(
@@ -54,49 +211,165 @@ async def check_servers_via_api():
     url = "https://epoch-status.info/api/trpc/post.getStatus?batch=1&input=%7B%220%22%3A%7B%22json%22%3Anull%2C%22meta%22%3A%7B%22values%22%3A%5B%22undefined%22%5D%7D%7D%7D"
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
+        session = await get_http_session()
+        async with session.get(url, timeout=10) as response:
+            if response.status == 200:
+                data = await response.json()
                     
-                    # Extract status from nested JSON structure
-                    status_data = data[0]["result"]["data"]["json"]
+                # Extract status from nested JSON structure
+                status_data = data[0]["result"]["data"]["json"]
                     
-                    # Build response in same format as socket method
-                    now_str = datetime.now(timezone.utc).strftime("%d.%m.%Y, %H:%M:%S UTC")
-                    api_states = {
-                        "Auth": {
-                            "online": status_data["auth"],
-                            "lastOnline": None,
-                            "lastChange": now_str
-                        },
-                        "Kezan": {
-                            "online": status_data["world1"],
-                            "lastOnline": None,
-                            "lastChange": now_str
-                        },
-                        "Gurubashi": {
-                            "online": status_data["world2"],
-                            "lastOnline": None,
-                            "lastChange": now_str
-                        }
+                # Build response in same format as socket method
+                now_str = datetime.now(timezone.utc).strftime("%d.%m.%Y, %H:%M:%S UTC")
+                api_states = {
+                    "Auth": {
+                        "online": status_data["auth"],
+                        "lastOnline": None,
+                        "lastChange": now_str
+                    },
+                    "Kezan": {
+                        "online": status_data["world1"],
+                        "lastOnline": None,
+                        "lastChange": now_str
+                    },
+                    "Gurubashi": {
+                        "online": status_data["world2"],
+                        "lastOnline": None,
+                        "lastChange": now_str
                     }
+                }
                     
-                    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-                    print(f"[{timestamp}] API check successful - Auth: {'ON' if status_data['auth'] else 'OFF'}, Kezan: {'ON' if status_data['world1'] else 'OFF'}, Gurubashi: {'ON' if status_data['world2'] else 'OFF'}")
+                timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+                print(f"[{timestamp}] API check successful - Auth: {'ON' if status_data['auth'] else 'OFF'}, Kezan: {'ON' if status_data['world1'] else 'OFF'}, Gurubashi: {'ON' if status_data['world2'] else 'OFF'}")
                     
-                    return api_states
-                else:
-                    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-                    print(f"[{timestamp}] API returned status code: {response.status}")
-                    return None
+                return api_states
+            else:
+                timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+                print(f"[{timestamp}] API returned status code: {response.status}")
+                return None
     except Exception as e:
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
         print(f"[{timestamp}] API check failed: {e}")
         return None
 
+def _world_online(states: Dict[str, dict]) -> bool:
+    return any(states.get(name, {}).get("online", False) for name in SERVERS if name != "Auth")
+
+def _needs_api_fallback(states: Optional[Dict[str, dict]]) -> bool:
+    """True when a socket result is inconclusive: everything offline (possible connection issues) or only Auth online."""
+    if not states:
+        return True
+    return not _world_online(states)
+
+def _merge_online(socket_result: Optional[Dict[str, dict]], api_result: Optional[Dict[str, dict]]) -> Dict[str, dict]:
+    """Per-server OR of both sources, keeping the socket bookkeeping where available."""
+    if not socket_result or not api_result:
+        return socket_result or api_result or {}
+    merged = {}
+    for name in SERVERS:
+        merged[name] = dict(socket_result.get(name) or api_result.get(name) or {})
+        merged[name]["online"] = (socket_result.get(name, {}).get("online", False) or
+                                  api_result.get(name, {}).get("online", False))
+    return merged
+
+def _reconcile(socket_result, socket_done: bool, api_result, api_done: bool):
+    """
+    Applies PROBE_RECONCILE_POLICY to whatever results are in so far.
+    Returns the states to use, or None if more results are needed.
+    """
+    if PROBE_RECONCILE_POLICY == "any_online":
+        if socket_done and api_done:
+            return _merge_online(socket_result, api_result)
+        return None
+
+    if PROBE_RECONCILE_POLICY == "first_online":
+        # A world server seen online by either source is answered immediately
+        for result in (socket_result, api_result):
+            if result and _world_online(result):
+                return result
+
+    # prefer_socket: socket answer unless it is inconclusive, then the API answer
+    if not socket_done:
+        return None
+    if not _needs_api_fallback(socket_result):
+        return socket_result
+    if not api_done:
+        return None
+    return api_result or socket_result or {}
+
+async def poll_servers_hedged():
+    """
+    Hedged probe: the API request starts alongside the socket probe (after PROBE_HEDGE_DELAY seconds
+    if the sockets haven't answered yet) instead of strictly after it, so an inconclusive socket
+    result costs max(socket, API) rather than socket + API.
+    """
+    started = time.monotonic()
+    socket_task = asyncio.create_task(poll_servers_socket())
+    api_task = None
+    socket_result = api_result = None
+    socket_done = api_done = False
+    try:
+        done, _ = await asyncio.wait({socket_task}, timeout=PROBE_HEDGE_DELAY)
+        if not done:
+            api_task = asyncio.create_task(check_servers_via_api())
+
+        pending = {task for task in (socket_task, api_task) if task is not None}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    result = task.result()
+                except Exception as e:
+                    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+                    print(f"[{timestamp}] {'Socket' if task is socket_task else 'API'} probe failed ({e})")
+                    result = None
+                if task is socket_task:
+                    socket_result, socket_done = result, True
+                else:
+                    api_result, api_done = result, True
+
+            states = _reconcile(socket_result, socket_done, api_result, api_done)
+            if states is not None:
+                timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+                source = "socket" if states is socket_result else "API" if states is api_result else "merged"
+                print(f"[{timestamp}] Hedged probe answered from {source} results in {time.monotonic() - started:.2f}s")
+                return states
+
+            # Socket answered before the hedge fired but was inconclusive: start the API now
+            if api_task is None:
+                timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+                print(f"[{timestamp}] Socket probe inconclusive, trying API fallback...")
+                api_task = asyncio.create_task(check_servers_via_api())
+                pending.add(api_task)
+
+        return socket_result or api_result or {}
+    finally:
+        for task in (socket_task, api_task):
+            if task is not None and not task.done():
+                task.cancel()
+
 async def poll_servers():
-    """Main function - tries socket connections first, falls back to API if needed"""
+    """Main function - polls with the configured PROBE_MODE and refreshes the status snapshot"""
+    if PROBE_MODE == "hedged":
+        states = await poll_servers_hedged()
+    else:
+        states = await poll_servers_sequential()
+    if states:
+        status_snapshot.update(states=states, polled_at=time.monotonic())
+    return states
+
+async def get_status_snapshot() -> Tuple[Optional[Dict], float]:
+    """
+    Returns (server_states, age_seconds) from the latest poll, usually the background poller's.
+    Probes again only when the snapshot is older than STATUS_SNAPSHOT_MAX_AGE; concurrent
+    callers share that single probe.
+    """
+    if status_snapshot["states"] is None or time.monotonic() - status_snapshot["polled_at"] > STATUS_SNAPSHOT_MAX_AGE:
+        await _single_flight("status", poll_servers)
+    return status_snapshot["states"], time.monotonic() - status_snapshot["polled_at"]
+
+async def poll_servers_sequential():
+    """Tries socket connections first, falls back to API if needed"""
     try:
         # Try socket method first
         socket_result = await poll_servers_socket()
@@ -140,77 +413,305 @@ async def poll_servers():
             print(f"[{timestamp}] Both socket and API methods failed")
             return {}
 
-async def check_patch_updates() -> Tuple[bool, Optional[Dict], List[str]]:
+# --- Patch Manifest ---
+MANIFEST_URL = "https://updater.project-epoch.net/api/v2/manifest?environment=production"
+
+# Last manifest body and its validators, so unchanged manifests come back as a bodyless 304
+_manifest_cache = {"etag": None, "last_modified": None, "manifest": None}
+# Latest manifest summary for read-only consumers like !patch, and the last detected update.
+# Both are written by check_patch_updates, which owns detection; monotonic fetch time.
+try:
+    MANIFEST_SNAPSHOT_TTL = float(os.environ.get("MANIFEST_SNAPSHOT_TTL", "90"))
+except ValueError:
+    MANIFEST_SNAPSHOT_TTL = 90.0
+manifest_snapshot = {"manifest": None, "fetched_at": 0.0, "last_update": None}
+# Daily transfer/parse counters; bytes_fetched is on the wire (compressed), bytes_decoded after
+manifest_stats = {"day": None, "requests": 0, "not_modified": 0, "bytes_fetched": 0, "bytes_decoded": 0, "parse_seconds": 0.0}
+
+def _roll_manifest_stats():
+    """Logs and resets the manifest counters when the UTC day changes."""
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    if manifest_stats["day"] == today:
+        return
+    if manifest_stats["day"] is not None:
+        print(f"[{datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}] Manifest stats for {manifest_stats['day']}: {format_manifest_stats()}")
+    manifest_stats.update(day=today, requests=0, not_modified=0, bytes_fetched=0, bytes_decoded=0, parse_seconds=0.0)
+
+def format_manifest_stats() -> str:
+    """One-line summary of today's manifest counters."""
+    return (f"{manifest_stats['requests']} requests, {manifest_stats['not_modified']} not modified, "
+            f"{manifest_stats['bytes_fetched']} bytes fetched ({manifest_stats['bytes_decoded']} decoded), "
+            f"{manifest_stats['parse_seconds'] * 1000:.1f}ms parse CPU")
+
+async def get_manifest_snapshot() -> Tuple[Optional[Dict], float]:
     """
-    Check for patch updates by comparing current manifest version and UID with stored values.
-    Returns (has_updates, manifest_data, updated_files)
+    Returns (manifest_summary, age_seconds) without touching the stored version.
+    Served from the snapshot the background check keeps fresh; refetched only when older than the TTL.
+    """
+    if manifest_snapshot["manifest"] is None or time.monotonic() - manifest_snapshot["fetched_at"] > MANIFEST_SNAPSHOT_TTL:
+        manifest = await _single_flight("manifest", get_current_patch_info)
+        if manifest is not None:
+            manifest_snapshot.update(manifest=manifest, fetched_at=time.monotonic())
+    return manifest_snapshot["manifest"], time.monotonic() - manifest_snapshot["fetched_at"]
+
+# "No more entries" marker for next(); None can't be used, a manifest may contain null entries
+_END = object()
+
+def _timed(files: Iterable[Dict]) -> Iterator[Dict]:
+    """Yield file entries, adding the time spent producing each one to the parse CPU counter."""
+    iterator = iter(files)
+    while True:
+        started = time.process_time()
+        entry = next(iterator, _END)
+        manifest_stats["parse_seconds"] += time.process_time() - started
+        if entry is _END:
+            return
+        yield entry
+
+def _stream_manifest(body: bytes, summary: Dict) -> Iterator[Dict]:
+    """
+    Single ijson pass over a manifest body: yields each Files entry and stores every other
+    top-level field (nested values and nulls included) in summary, then FileCount at the end.
+    Values are built on a plain container stack; entries are yielded instead of appended to
+    Files, so only one entry is held at a time.
+    """
+    stack = []  # open containers, stack[0] is the document itself
+    keys = []   # the current key of each open map (None for arrays)
+    file_count = 0
+    for event, value in ijson.basic_parse(body, use_float=True):
+        if event == "map_key":
+            keys[-1] = value
+            continue
+        if event == "start_map" or event == "start_array":
+            stack.append({} if event == "start_map" else [])
+            keys.append(None)
+            continue
+        if event == "end_map" or event == "end_array":
+            value = stack.pop()
+            keys.pop()
+            if not stack:
+                break
+        # A finished value: attach it to its parent, or hand it out if it is a file entry
+        if len(stack) == 1:
+            if keys[0] != "Files":
+                summary[keys[0]] = value
+        elif len(stack) == 2 and keys[0] == "Files":
+            file_count += 1
+            yield value
+        elif type(stack[-1]) is dict:
+            stack[-1][keys[-1]] = value
+        else:
+            stack[-1].append(value)
+    summary["FileCount"] = file_count
+
+def parse_manifest(body: bytes) -> Tuple[Dict, Iterator[Dict]]:
+    """
+    Parse a manifest body into (summary, files).
+    The summary holds the top-level fields plus FileCount, without the Files list. With ijson
+    installed the body is read in a single streaming pass: fields before Files are in the summary
+    straight away, and the rest plus FileCount once files has been exhausted. Otherwise the body
+    is decoded whole. Both paths produce the same summary and entries.
+    """
+    if ijson is not None:
+        summary = {}
+        files = _stream_manifest(body, summary)
+        # Read up to the first entry so the fields ahead of Files are already in the summary
+        first = next(files, _END)
+        return summary, (itertools.chain((first,), files) if first is not _END else iter(()))
+
+    manifest = orjson.loads(body) if orjson is not None else json.loads(body)
+    files = manifest.pop("Files", [])
+    manifest["FileCount"] = len(files)
+    return manifest, iter(files)
+
+async def fetch_manifest(conditional: bool = True) -> Tuple[Optional[Dict], Optional[Iterator[Dict]]]:
+    """
+    Fetch the updater manifest with a conditional GET.
+    Returns (summary, files) as parse_manifest does; on 304 the cached summary is returned
+    with files=None. Raises on connection errors, returns (None, None) on unexpected status codes.
+    conditional=False sends a plain GET and leaves the cache alone, so the patch checker
+    still sees (and diffs) the next changed body itself.
+    """
+    _roll_manifest_stats()
+    headers = {"Accept-Encoding": "gzip, deflate"}
+    if conditional and _manifest_cache["manifest"] is not None:
+        if _manifest_cache["etag"]:
+            headers["If-None-Match"] = _manifest_cache["etag"]
+        if _manifest_cache["last_modified"]:
+            headers["If-Modified-Since"] = _manifest_cache["last_modified"]
+
+    session = await get_http_session()
+    async with session.get(MANIFEST_URL, headers=headers, timeout=10) as response:
+        manifest_stats["requests"] += 1
+        if response.status == 304:
+            manifest_stats["not_modified"] += 1
+            return _manifest_cache["manifest"], None
+        if response.status != 200:
+            timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+            print(f"[{timestamp}] Patch API returned status code: {response.status}")
+            return None, None
+        body = await response.read()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        manifest_stats["bytes_fetched"] += int(response.headers.get("Content-Length", len(body)))
+        manifest_stats["bytes_decoded"] += len(body)
+
+    started = time.process_time()
+    manifest, files = parse_manifest(body)
+    manifest_stats["parse_seconds"] += time.process_time() - started
+
+    if conditional:
+        _manifest_cache.update(etag=etag, last_modified=last_modified, manifest=manifest)
+    return manifest, _timed(files)
+
+class ManifestDiffer:
+    """
+    Incremental differ between manifest file lists and the patch_files table.
+    The stored path->hash index is loaded once and kept in sync with every committed diff.
+    """
+
+    def __init__(self):
+        self._index: Optional[Dict[str, str]] = None
+
+    async def load(self, db):
+        """Load the stored index on first use."""
+        if self._index is None:
+            self._index = dict(await db.get_all_stored_files())
+
+    def diff(self, files) -> Dict:
+        """
+        Compare manifest file entries ({"Path", "Hash", "Size"}) against the index in one pass.
+        Returns {"added", "changed", "removed", "changed_bytes", "upserts"}.
+        """
+        added, changed, upserts = [], [], []
+        changed_bytes = 0
+        seen = set()
+        for entry in files:
+            # Null or malformed entries are skipped like entries without a path
+            path = entry.get("Path") if isinstance(entry, dict) else None
+            if not path:
+                continue
+            file_hash = entry.get("Hash", "")
+            seen.add(path)
+            stored = self._index.get(path)
+            if stored == file_hash:
+                continue
+            (added if stored is None else changed).append(path)
+            upserts.append((path, file_hash))
+            changed_bytes += entry.get("Size", 0) or 0
+        removed = [path for path in self._index if path not in seen]
+        return {"added": added, "changed": changed, "removed": removed, "changed_bytes": changed_bytes, "upserts": upserts}
+
+    async def commit(self, db, diff: Dict):
+        """Persist a diff in one batched transaction and apply it to the in-memory index."""
+        if not diff["upserts"] and not diff["removed"]:
+            return
+        await db.apply_file_diff(diff["upserts"], diff["removed"])
+        self._index.update(diff["upserts"])
+        for path in diff["removed"]:
+            del self._index[path]
+
+_manifest_differ = ManifestDiffer()
+
+def _empty_diff() -> Dict:
+    return {"added": [], "changed": [], "removed": [], "changed_bytes": 0, "upserts": []}
+
+def format_file_diff(diff: Dict) -> str:
+    """One-line summary of a file diff, e.g. "3 added, 12 changed, 0 removed (48.2 MB)"."""
+    return (f"{len(diff['added'])} added, {len(diff['changed'])} changed, {len(diff['removed'])} removed "
+            f"({diff['changed_bytes'] / (1024 * 1024):.1f} MB)")
+
+async def check_patch_updates() -> Tuple[bool, Optional[Dict], Dict]:
+    """
+    Check for patch updates by comparing current manifest version and UID with stored values,
+    and diff the manifest's file list against the stored file hashes.
+    Returns (has_updates, manifest_summary, file_diff); file_diff is empty when the manifest is unchanged.
+    Writes the stored version, so only the background patch task may call it; commands use get_manifest_snapshot().
+    The version is stored only after the file diff commits; on any failure the manifest validators are dropped
+    so the next check refetches the full body instead of getting a 304 for an update that was never recorded.
     """
-    url = "https://updater.project-epoch.net/api/v2/manifest?environment=production"
-    
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=10) as response:
-                if response.status == 200:
-                    manifest = await response.json()
-                    
-                    # Use the same database file as the main bot
-                    DATABASE_FILE = os.environ.get("DATABASE_FILE", "bot_settings.db")
-                    db = Database(DATABASE_FILE)
-                    
-                    current_version = manifest.get("Version", "Unknown")
-                    current_uid = manifest.get("Uid", "Unknown")
-                    
-                    # Check if version has changed
-                    stored_version_info = db.get_stored_version()
-                    has_updates = False
-                    
-                    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-                    
-                    if stored_version_info:
-                        stored_version, stored_uid = stored_version_info
-                        if stored_version != current_version or stored_uid != current_uid:
-                            has_updates = True
-                            print(f"[{timestamp}] PATCH UPDATE DETECTED:")
-                            print(f"[{timestamp}]   Version: {stored_version} → {current_version}")
-                            print(f"[{timestamp}]   UID: {stored_uid[:12]}... → {current_uid[:12]}...")
-                            # Update stored version
-                            db.update_version(current_version, current_uid)
-                        else:
-                            print(f"[{timestamp}] Patch check: No updates - Version {current_version} unchanged")
-                    else:
-                        # First time - store current version
-                        has_updates = True
-                        print(f"[{timestamp}] INITIAL PATCH SETUP:")
-                        print(f"[{timestamp}]   Version: {current_version}")
-                        print(f"[{timestamp}]   UID: {current_uid[:12]}...")
-                        db.update_version(current_version, current_uid)
-                    
-                    # For compatibility, return empty list for updated_files since we're not tracking individual files anymore
-                    updated_files = []
-                    
-                    return has_updates, manifest, updated_files
-                    
-                else:
-                    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-                    print(f"[{timestamp}] Patch API returned status code: {response.status}")
-                    return False, None, []
-                    
+        manifest, files = await fetch_manifest()
+        if manifest is None:
+            return False, None, _empty_diff()
+
+        stored_version_info = await _db.get_stored_version()
+
+        # Only a new manifest body can change the file list. Diffed first: a streamed summary
+        # is only complete once every file entry has been read.
+        file_diff = _empty_diff()
+        if files is not None:
+            await _manifest_differ.load(_db)
+            file_diff = _manifest_differ.diff(files)
+            await _manifest_differ.commit(_db, file_diff)
+
+        current_version = manifest.get("Version", "Unknown")
+        current_uid = manifest.get("Uid", "Unknown")
+
+        # Check if version has changed
+        has_updates = False
+        store_version = False
+        previous = stored_version_info
+
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+        if stored_version_info:
+            stored_version, stored_uid = stored_version_info
+            if stored_version != current_version or stored_uid != current_uid:
+                has_updates = True
+                print(f"[{timestamp}] PATCH UPDATE DETECTED:")
+                print(f"[{timestamp}]   Version: {stored_version} → {current_version}")
+                print(f"[{timestamp}]   UID: {stored_uid[:12]}... → {current_uid[:12]}...")
+                store_version = True
+            else:
+                print(f"[{timestamp}] Patch check: No updates - Version {current_version} unchanged")
+        else:
+            # First time - store current version
+            has_updates = True
+            print(f"[{timestamp}] INITIAL PATCH SETUP:")
+            print(f"[{timestamp}]   Version: {current_version}")
+            print(f"[{timestamp}]   UID: {current_uid[:12]}...")
+            store_version = True
+
+        manifest_snapshot.update(manifest=manifest, fetched_at=time.monotonic())
+
+        if files is not None:
+            # Seeded once a version has been stored; an empty stored file list alone doesn't mean first run
+            if stored_version_info is None:
+                # First run only records the baseline; every file would otherwise show as added
+                file_diff = _empty_diff()
+            elif file_diff["upserts"] or file_diff["removed"]:
+                print(f"[{timestamp}] Patch files: {format_file_diff(file_diff)}")
+
+        # Update stored version
+        if store_version:
+            await _db.update_version(current_version, current_uid)
+
+        if has_updates:
+            manifest_snapshot["last_update"] = {
+                "version": current_version,
+                "uid": current_uid,
+                "previous": previous,
+                "file_diff": file_diff,
+                "detected_at": datetime.now(timezone.utc)
+            }
+
+        return has_updates, manifest, file_diff
+
     except Exception as e:
+        _manifest_cache.update(etag=None, last_modified=None, manifest=None)
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
         print(f"[{timestamp}] Patch check failed: {e}")
-        return False, None, []
+        return False, None, _empty_diff()
 
 async def get_current_patch_info() -> Optional[Dict]:
-    """Get current patch information without checking for updates."""
-    url = "https://updater.project-epoch.net/api/v2/manifest?environment=production"
-    
+    """Get the current manifest summary without checking for updates."""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=10) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    return None
+        manifest, files = await fetch_manifest(conditional=False)
+        # Drain the entries so a streamed summary also holds the fields after Files and FileCount
+        for _ in files or ():
+            pass
+        return manifest
     except Exception as e:
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
         print(f"[{timestamp}] Failed to get patch info: {e}")